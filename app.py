@@ -1,5 +1,5 @@
 from flask import Flask, render_template, request, jsonify
-from chess import RemoteGame  # Ensure the path is correct
+from chess import RemoteGame, DRAW_REASONS  # Ensure the path is correct
 from chess_bots import *
 import random
 
@@ -27,6 +27,8 @@ def maybe_bot_move():
             current_bot = bot1
         elif bot_enabled == 'bot2':
             current_bot = bot2
+        elif bot_enabled == 'search':
+            current_bot = search_bot
             
         if current_bot:
             move = current_bot.get_bot_move(game)
@@ -40,9 +42,8 @@ def maybe_bot_move():
             if result == "promotion_needed":
                 piece_type = current_bot.handle_promotion()
                 print(f"Bot promotes pawn to: {piece_type}")  # Add log
-                game.promote_pawn(end, piece_type)
-                # Switch turn
-                game.turn = 'black' if game.turn == 'white' else 'white'
+                # Completes the move and switches turn
+                game.handle_promotion(end, piece_type)
             
             game.display_board()
 
@@ -112,6 +113,14 @@ def make_move():
             'board': game.get_board(),
             'turn_color': game.turn
         })
+    elif result == "draw":
+        return jsonify({
+            'status': 'success',
+            'game_over': True,
+            'message': f'Draw by {DRAW_REASONS[game.game_status()]}!',
+            'board': game.get_board(),
+            'turn_color': game.turn
+        })
     elif result:
         return jsonify({
             'status': 'success',
@@ -205,6 +214,14 @@ def promote():
             'board': game.get_board(),
             'turn_color': game.turn
         })
+    elif result == "draw":
+        return jsonify({
+            'status': 'success',
+            'game_over': True,
+            'message': f'Draw by {DRAW_REASONS[game.game_status()]}!',
+            'board': game.get_board(),
+            'turn_color': game.turn
+        })
     return jsonify({'status': 'invalid promotion'})
 
 @app.route('/quit', methods=['POST'])
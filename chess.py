@@ -1,296 +1,733 @@
-import copy
 import random
-from chess_bots import *
+from collections import OrderedDict
 
 
-class Piece:
-    def __init__(self, color):
-        self.color = color
+# Colors and piece types used by the bitboard position.
+WHITE = 0
+BLACK = 1
+COLOR_NAMES = ('white', 'black')
 
-    def __str__(self):
-        raise NotImplementedError("Subclasses must implement __str__")
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+PIECE_SYMBOLS = 'PNBRQK'
+PROMOTION_PIECES = {'Q': QUEEN, 'R': ROOK, 'B': BISHOP, 'N': KNIGHT}
 
-    def is_valid_move(self, start, end, board, last_move=None):
-        raise NotImplementedError("Subclasses must implement is_valid_move")
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
 
+# Draw results of Game.game_status() and how to describe them.
+DRAW_REASONS = {
+    'fifty_move_rule': 'fifty-move rule',
+    'threefold_repetition': 'threefold repetition',
+    'insufficient_material': 'insufficient material',
+}
+
+# Shared (color, piece_type) tuples stored in the mailbox.
+PIECES = [[(color, piece_type) for piece_type in range(6)] for color in (WHITE, BLACK)]
+
+# Castling right flags.
+WHITE_KINGSIDE = 1
+WHITE_QUEENSIDE = 2
+BLACK_KINGSIDE = 4
+BLACK_QUEENSIDE = 8
 
-class Pawn(Piece):
-    def __init__(self, color):
-        super().__init__(color)
-        self.has_moved = False
+# Castling moves keyed by the king's target square:
+# (right flag, king start, rook start, rook end, squares that must be empty,
+#  squares the king starts on or passes that must not be attacked)
+CASTLING_MOVES = {
+    62: (WHITE_KINGSIDE, 60, 63, 61, (61, 62), (60, 61)),
+    58: (WHITE_QUEENSIDE, 60, 56, 59, (57, 58, 59), (60, 59)),
+    6: (BLACK_KINGSIDE, 4, 7, 5, (5, 6), (4, 5)),
+    2: (BLACK_QUEENSIDE, 4, 0, 3, (1, 2, 3), (4, 3)),
+}
+
+# Moving from or to these squares removes the matching castling rights.
+CASTLING_MASKS = [15] * 64
+CASTLING_MASKS[60] &= ~(WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_MASKS[63] &= ~WHITE_KINGSIDE
+CASTLING_MASKS[56] &= ~WHITE_QUEENSIDE
+CASTLING_MASKS[4] &= ~(BLACK_KINGSIDE | BLACK_QUEENSIDE)
+CASTLING_MASKS[7] &= ~BLACK_KINGSIDE
+CASTLING_MASKS[0] &= ~BLACK_QUEENSIDE
+CASTLING_SYMBOLS = [('K', WHITE_KINGSIDE), ('Q', WHITE_QUEENSIDE), ('k', BLACK_KINGSIDE), ('q', BLACK_QUEENSIDE)]
 
-    def __str__(self):
-        return 'P' if self.color == 'white' else 'p'
 
-    def can_promote(self, end_pos):
-        r2, _ = end_pos
-        return (self.color == 'white' and r2 == 0) or (self.color == 'black' and r2 == 7)
+def color_index(color):
+    return WHITE if color == 'white' else BLACK
 
-    def is_valid_move(self, start, end, board, last_move=None):
-        r1, c1 = start
-        r2, c2 = end
-        direction = -1 if self.color == "white" else 1  # White moves up (decreasing row), black moves down
 
-        # Forward move (no capture)
-        if c1 == c2:
-            # One step forward
-            if r2 == r1 + direction and board[r2][c2] is None:
-                return True
-            # Two steps forward on first move
-            if (
-                not self.has_moved 
-                and r2 == r1 + 2 * direction 
-                and board[r1 + direction][c1] is None 
-                and board[r2][c2] is None
-            ):
-                return True
-
-        # Diagonal capture
-        if abs(c2 - c1) == 1 and r2 == r1 + direction:
-            # Normal capture
-            if board[r2][c2] is not None and board[r2][c2].color != self.color:
-                return True
-            # En passant capture
-            if last_move:
-                prev_start, prev_end = last_move
-                moved_piece = board[prev_end[0]][prev_end[1]]
-                # Check that the enemy pawn just moved two squares and is adjacent.
-                if (
-                    isinstance(moved_piece, Pawn)
-                    and moved_piece.color != self.color
-                    and abs(prev_start[0] - prev_end[0]) == 2
-                    and prev_end[0] == r1 
-                    and prev_end[1] == c2
-                ):
-                    return True
-
-        return False
+def square_index(pos):
+    # Square index is row * 8 + col, the same layout the front end uses.
+    r, c = pos
+    return r * 8 + c
 
-    def move(self, start, end):
-        self.has_moved = True
 
+def square_coords(square):
+    return divmod(square, 8)
+
+
+# Moves are encoded as from_sq | to_sq << 6 | promotion << 12,
+# where promotion is the promoted piece type or 0 (PAWN) for none.
+def move_code(from_sq, to_sq, promotion=0):
+    return from_sq | to_sq << 6 | promotion << 12
 
-class Rook(Piece):
-    def __init__(self, color):
-        super().__init__(color)
-        self.has_moved = False
 
-    def __str__(self):
-        return 'R' if self.color == 'white' else 'r'
+def decode_move(move):
+    return move & 63, move >> 6 & 63, move >> 12
+
+
+def square_name(square):
+    # Algebraic name of a square, e.g. 'e2'.
+    r, c = divmod(square, 8)
+    return 'abcdefgh'[c] + str(8 - r)
+
+
+def parse_square(name):
+    return (8 - int(name[1])) * 8 + 'abcdefgh'.index(name[0])
+
+
+def move_to_uci(move):
+    # Long algebraic notation, e.g. 'e2e4' or 'e7e8q'.
+    from_sq, to_sq, promotion = decode_move(move)
+    uci = square_name(from_sq) + square_name(to_sq)
+    if promotion:
+        uci += PIECE_SYMBOLS[promotion].lower()
+    return uci
+
+
+def _offset_targets(offsets):
+    # For every square, the squares reached by jumping once with each (dr, dc) offset.
+    table = []
+    for square in range(64):
+        r, c = divmod(square, 8)
+        table.append([
+            (r + dr) * 8 + c + dc
+            for dr, dc in offsets
+            if 0 <= r + dr < 8 and 0 <= c + dc < 8
+        ])
+    return table
+
+
+def _ray_squares(directions):
+    # For every square, the squares along each (dr, dc) direction ordered outwards.
+    table = []
+    for square in range(64):
+        r, c = divmod(square, 8)
+        rays = []
+        for dr, dc in directions:
+            ray = []
+            r2, c2 = r + dr, c + dc
+            while 0 <= r2 < 8 and 0 <= c2 < 8:
+                ray.append(r2 * 8 + c2)
+                r2 += dr
+                c2 += dc
+            rays.append(ray)
+        table.append(rays)
+    return table
+
+
+KNIGHT_OFFSETS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+KING_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+ROOK_DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+BISHOP_DIRECTIONS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+KNIGHT_TARGETS = _offset_targets(KNIGHT_OFFSETS)
+KING_TARGETS = _offset_targets(KING_OFFSETS)
+ROOK_RAYS = _ray_squares(ROOK_DIRECTIONS)
+BISHOP_RAYS = _ray_squares(BISHOP_DIRECTIONS)
+QUEEN_RAYS = [ROOK_RAYS[square] + BISHOP_RAYS[square] for square in range(64)]
+SLIDER_RAYS = {BISHOP: BISHOP_RAYS, ROOK: ROOK_RAYS, QUEEN: QUEEN_RAYS}
+
+# White pawns move up the board (decreasing row), black pawns move down.
+PAWN_CAPTURE_TARGETS = [_offset_targets([(-1, -1), (-1, 1)]), _offset_targets([(1, -1), (1, 1)])]
+PAWN_DIRECTIONS = [-8, 8]
+PAWN_START_ROWS = [6, 1]
+PROMOTION_TYPES = (QUEEN, ROOK, BISHOP, KNIGHT)
 
-    def is_valid_move(self, start, end, board, last_move=None):
-        r1, c1 = start
-        r2, c2 = end
 
-        # Must move in a straight line.
-        if r1 != r2 and c1 != c2:
-            return False
-
-        # Check path clearance.
-        if r1 == r2:
-            step = 1 if c2 > c1 else -1
-            for c in range(c1 + step, c2, step):
-                if board[r1][c] is not None:
-                    return False
-        else:
-            step = 1 if r2 > r1 else -1
-            for r in range(r1 + step, r2, step):
-                if board[r][c1] is not None:
-                    return False
+def _bitboards(table):
+    return [sum(1 << target for target in targets) for targets in table]
 
-        # Cannot capture your own piece.
-        if board[r2][c2] is not None and board[r2][c2].color == self.color:
-            return False
-
-        return True
 
-    def move(self, start, end):
-        self.has_moved = True
+LIGHT_SQUARES = sum(1 << square for square in range(64) if (square // 8 + square % 8) % 2 == 0)
 
 
-class Bishop(Piece):
-    def __init__(self, color):
-        super().__init__(color)
-    
-    def __str__(self):
-        return 'B' if self.color == 'white' else 'b'
-    
-    def is_valid_move(self, start, end, board, last_move=None):
-        r1, c1 = start
-        r2, c2 = end
+# Attack bitboards: KNIGHT_ATTACKS[sq] holds every square a knight on sq attacks.
+KNIGHT_ATTACKS = _bitboards(KNIGHT_TARGETS)
+KING_ATTACKS = _bitboards(KING_TARGETS)
+PAWN_ATTACKS = [_bitboards(PAWN_CAPTURE_TARGETS[WHITE]), _bitboards(PAWN_CAPTURE_TARGETS[BLACK])]
+
+# Ray bitboards per direction. Squares along a "positive" ray have higher indices
+# than the origin, so the nearest blocker is the lowest set bit, otherwise the highest.
+ROOK_RAY_MASKS = [
+    [_bitboards(ROOK_RAYS[square][i:i + 1])[0] for square in range(64)] for i in range(4)
+]
+BISHOP_RAY_MASKS = [
+    [_bitboards(BISHOP_RAYS[square][i:i + 1])[0] for square in range(64)] for i in range(4)
+]
+ROOK_RAY_POSITIVE = [dr * 8 + dc > 0 for dr, dc in ROOK_DIRECTIONS]
+BISHOP_RAY_POSITIVE = [dr * 8 + dc > 0 for dr, dc in BISHOP_DIRECTIONS]
+
+
+def _slider_attacks(square, occupied, ray_masks, positive):
+    attacks = 0
+    for masks, is_positive in zip(ray_masks, positive):
+        ray = masks[square]
+        blockers = ray & occupied
+        if blockers:
+            if is_positive:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            # Drop the squares hidden behind the nearest blocker.
+            ray ^= masks[blocker]
+        attacks |= ray
+    return attacks
 
-        if abs(r2 - r1) != abs(c2 - c1):
-            return False
 
-        row_step = 1 if r2 > r1 else -1
-        col_step = 1 if c2 > c1 else -1
+def rook_attacks(square, occupied):
+    return _slider_attacks(square, occupied, ROOK_RAY_MASKS, ROOK_RAY_POSITIVE)
 
-        r, c = r1 + row_step, c1 + col_step
-        while r != r2 and c != c2:
-            if board[r][c] is not None:
-                return False
-            r += row_step
-            c += col_step
 
-        # Cannot capture your own piece.
-        if board[r2][c2] is not None and board[r2][c2].color == self.color:
-            return False
+def bishop_attacks(square, occupied):
+    return _slider_attacks(square, occupied, BISHOP_RAY_MASKS, BISHOP_RAY_POSITIVE)
 
-        return True
 
+# Zobrist keys, from a fixed seed so position hashes are stable between runs.
+_zobrist_random = random.Random(20250101)
+ZOBRIST_PIECES = [
+    [[_zobrist_random.getrandbits(64) for _ in range(64)] for _ in range(6)] for _ in (WHITE, BLACK)
+]
+ZOBRIST_SIDE = _zobrist_random.getrandbits(64)  # Black to move.
+ZOBRIST_EP_FILES = [_zobrist_random.getrandbits(64) for _ in range(8)]
+_castling_keys = [_zobrist_random.getrandbits(64) for _ in range(4)]
+ZOBRIST_CASTLING = [0] * 16
+for _rights in range(16):
+    for _bit in range(4):
+        if _rights >> _bit & 1:
+            ZOBRIST_CASTLING[_rights] ^= _castling_keys[_bit]
 
-class Knight(Piece):
-    def __init__(self, color):
-        super().__init__(color)
-    
-    def __str__(self):
-        return 'N' if self.color == 'white' else 'n'
-    
-    def is_valid_move(self, start, end, board, last_move=None):
-        r1, c1 = start
-        r2, c2 = end
 
-        # Cannot capture your own piece.
-        if board[r2][c2] is not None and board[r2][c2].color == self.color:
-            return False
+class Position:
+    """
+    Bitboard representation of a chess position.
+    Bit n of every bitboard is square n = row * 8 + col, so bit 0 is a8 and bit 63 is h1.
+    A 64-entry mailbox mirrors the bitboards for constant time piece lookup.
+    """
+    # Set to True to recompute the Zobrist key after every push/pop and fail on drift.
+    verify_hashes = False
 
-        if (
-            (abs(r2 - r1) == 2 and abs(c2 - c1) == 1) 
-            or (abs(r2 - r1) == 1 and abs(c2 - c1) == 2)
-        ):
+    def __init__(self):
+        self.pieces = [[0] * 6, [0] * 6]  # pieces[color][piece_type]
+        self.occupancy = [0, 0]  # occupancy[color]
+        self.mailbox = [None] * 64  # (color, piece_type) or None
+        self.king_squares = [None, None]  # king_squares[color], kept up to date by put/remove
+        self.side_to_move = WHITE
+        self.castling = 0
+        self.ep_square = None  # Square a pawn may capture en passant onto.
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.history = []  # Undo records for pop().
+        self.zobrist = 0  # 64-bit Zobrist key, updated incrementally.
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Build a position from a FEN string. The move counters may be omitted.
+        """
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError(f"Invalid FEN: {fen}")
+        position = cls()
+
+        rows = fields[0].split('/')
+        if len(rows) != 8:
+            raise ValueError(f"Invalid FEN: {fen}")
+        for r, row in enumerate(rows):
+            c = 0
+            for char in row:
+                if char.isdigit():
+                    c += int(char)
+                    continue
+                if char.upper() not in PIECE_SYMBOLS or c > 7:
+                    raise ValueError(f"Invalid FEN: {fen}")
+                color = WHITE if char.isupper() else BLACK
+                position.put_piece(r * 8 + c, color, PIECE_SYMBOLS.index(char.upper()))
+                c += 1
+            if c != 8:
+                raise ValueError(f"Invalid FEN: {fen}")
+
+        position.side_to_move = WHITE if fields[1] == 'w' else BLACK
+        for symbol, right in CASTLING_SYMBOLS:
+            if symbol in fields[2]:
+                position.castling |= right
+        position.ep_square = None if fields[3] == '-' else parse_square(fields[3])
+        if len(fields) >= 6:
+            position.halfmove_clock = int(fields[4])
+            position.fullmove_number = int(fields[5])
+        position.zobrist = position.compute_zobrist()
+        return position
+
+    def fen(self):
+        rows = []
+        for r in range(8):
+            row = ''
+            empty = 0
+            for c in range(8):
+                symbol = self.symbol_at(r * 8 + c)
+                if symbol == '.':
+                    empty += 1
+                    continue
+                if empty:
+                    row += str(empty)
+                    empty = 0
+                row += symbol
+            if empty:
+                row += str(empty)
+            rows.append(row)
+        castling = ''.join(symbol for symbol, right in CASTLING_SYMBOLS if self.castling & right) or '-'
+        ep_square = '-' if self.ep_square is None else square_name(self.ep_square)
+        return ' '.join([
+            '/'.join(rows), 'w' if self.side_to_move == WHITE else 'b',
+            castling, ep_square, str(self.halfmove_clock), str(self.fullmove_number),
+        ])
+
+    @property
+    def occupied(self):
+        return self.occupancy[WHITE] | self.occupancy[BLACK]
+
+    def copy(self):
+        new = Position.__new__(Position)
+        new.pieces = [self.pieces[WHITE][:], self.pieces[BLACK][:]]
+        new.occupancy = self.occupancy[:]
+        new.mailbox = self.mailbox[:]
+        new.king_squares = self.king_squares[:]
+        new.side_to_move = self.side_to_move
+        new.castling = self.castling
+        new.ep_square = self.ep_square
+        new.halfmove_clock = self.halfmove_clock
+        new.fullmove_number = self.fullmove_number
+        new.history = self.history[:]
+        new.zobrist = self.zobrist
+        return new
+
+    def piece_at(self, square):
+        return self.mailbox[square]
+
+    def put_piece(self, square, color, piece_type):
+        bit = 1 << square
+        self.pieces[color][piece_type] |= bit
+        self.occupancy[color] |= bit
+        self.mailbox[square] = PIECES[color][piece_type]
+        self.zobrist ^= ZOBRIST_PIECES[color][piece_type][square]
+        if piece_type == KING:
+            self.king_squares[color] = square
+
+    def remove_piece(self, square):
+        piece = self.mailbox[square]
+        if piece is not None:
+            color, piece_type = piece
+            mask = ~(1 << square)
+            self.pieces[color][piece_type] &= mask
+            self.occupancy[color] &= mask
+            self.mailbox[square] = None
+            self.zobrist ^= ZOBRIST_PIECES[color][piece_type][square]
+            if piece_type == KING:
+                self.king_squares[color] = None
+        return piece
+
+    def symbol_at(self, square):
+        piece = self.mailbox[square]
+        if piece is None:
+            return '.'
+        color, piece_type = piece
+        symbol = PIECE_SYMBOLS[piece_type]
+        return symbol if color == WHITE else symbol.lower()
+
+    def ep_zobrist(self):
+        # The en passant file is only part of the key when a pawn can actually capture there.
+        ep_square = self.ep_square
+        color = self.side_to_move
+        if ep_square is not None and PAWN_ATTACKS[color ^ 1][ep_square] & self.pieces[color][PAWN]:
+            return ZOBRIST_EP_FILES[ep_square & 7]
+        return 0
+
+    def compute_zobrist(self):
+        """
+        Compute the Zobrist key from scratch, to initialise or verify the incremental key.
+        """
+        key = ZOBRIST_CASTLING[self.castling] ^ self.ep_zobrist()
+        if self.side_to_move == BLACK:
+            key ^= ZOBRIST_SIDE
+        for square, piece in enumerate(self.mailbox):
+            if piece is not None:
+                key ^= ZOBRIST_PIECES[piece[0]][piece[1]][square]
+        return key
+
+    def verify_zobrist(self):
+        if self.zobrist != self.compute_zobrist():
+            raise RuntimeError(f"Zobrist key drifted from the position: {self.fen()}")
+
+    def repetition_count(self):
+        # How often the current position has occurred since the last capture or pawn move.
+        count = 1
+        history = self.history
+        # history[-n] holds the key from before the n-th last move; every second one has the same side to move.
+        for back in range(2, min(self.halfmove_clock, len(history)) + 1, 2):
+            if history[-back][6] == self.zobrist:
+                count += 1
+        return count
+
+    def has_insufficient_material(self):
+        # King against king, king and one minor piece, or bishops that all stand on one square color.
+        for color in (WHITE, BLACK):
+            pieces = self.pieces[color]
+            if pieces[PAWN] or pieces[ROOK] or pieces[QUEEN]:
+                return False
+        knights = self.pieces[WHITE][KNIGHT] | self.pieces[BLACK][KNIGHT]
+        bishops = self.pieces[WHITE][BISHOP] | self.pieces[BLACK][BISHOP]
+        minors = bin(knights | bishops).count('1')
+        if minors <= 1:
             return True
+        return not knights and not (bishops & LIGHT_SQUARES and bishops & ~LIGHT_SQUARES)
 
-        return False
-
+    def to_grid(self):
+        # 8x8 list of piece symbols, '.' for empty squares.
+        return [[self.symbol_at(r * 8 + c) for c in range(8)] for r in range(8)]
 
-class Queen(Piece):
-    def __init__(self, color):
-        super().__init__(color)
-
-    def __str__(self):
-        return 'Q' if self.color == 'white' else 'q'
-
-    def is_valid_move(self, start, end, board, last_move=None):
-        r1, c1 = start
-        r2, c2 = end
-
-        # Cannot capture your own piece.
-        if board[r2][c2] is not None and board[r2][c2].color == self.color:
-            return False
+    def push(self, move):
+        """
+        Play an encoded pseudo-legal move and record what pop() needs to undo it.
+        Handles en passant, castling, promotion and the castling/en passant bookkeeping.
+        """
+        from_sq = move & 63
+        to_sq = move >> 6 & 63
+        promotion = move >> 12
+        color, piece_type = self.mailbox[from_sq]
+
+        # En passant captures the pawn that just moved past the target square.
+        capture_sq = to_sq
+        if piece_type == PAWN and to_sq == self.ep_square:
+            capture_sq = to_sq + 8 if color == WHITE else to_sq - 8
+        captured = self.mailbox[capture_sq]
+
+        self.history.append(
+            (move, captured, capture_sq, self.castling, self.ep_square, self.halfmove_clock, self.zobrist)
+        )
+        # Take the old castling rights and en passant file out of the key.
+        self.zobrist ^= ZOBRIST_CASTLING[self.castling] ^ self.ep_zobrist()
+
+        if captured is not None:
+            self.remove_piece(capture_sq)
+        self.remove_piece(from_sq)
+        self.put_piece(to_sq, color, promotion or piece_type)
+
+        # Castling also moves the rook next to the king.
+        if piece_type == KING and abs(to_sq - from_sq) == 2:
+            _, _, rook_from, rook_to, _, _ = CASTLING_MOVES[to_sq]
+            self.remove_piece(rook_from)
+            self.put_piece(rook_to, color, ROOK)
+
+        self.castling &= CASTLING_MASKS[from_sq] & CASTLING_MASKS[to_sq]
+        if piece_type == PAWN and abs(to_sq - from_sq) == 16:
+            self.ep_square = (from_sq + to_sq) // 2
+        else:
+            self.ep_square = None
 
-        # Diagonal move.
-        if abs(r2 - r1) == abs(c2 - c1):
-            row_step = 1 if r2 > r1 else -1
-            col_step = 1 if c2 > c1 else -1
-            r, c = r1 + row_step, c1 + col_step
-            while r != r2:  # Modify here: only check up to r2
-                if board[r][c] is not None:
-                    return False
-                r += row_step
-                c += col_step
+        if piece_type == PAWN or captured is not None:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if color == BLACK:
+            self.fullmove_number += 1
+        self.side_to_move = color ^ 1
+        self.zobrist ^= ZOBRIST_CASTLING[self.castling] ^ self.ep_zobrist() ^ ZOBRIST_SIDE
+        if self.verify_hashes:
+            self.verify_zobrist()
+
+    def is_in_check(self, color):
+        king_square = self.king_squares[color]
+        return king_square is not None and self.is_square_attacked(king_square, color ^ 1)
+
+    def is_square_attacked(self, square, by_color):
+        """
+        Check whether any piece of by_color attacks square, working backwards from the square.
+        """
+        pieces = self.pieces[by_color]
+        if KNIGHT_ATTACKS[square] & pieces[KNIGHT]:
             return True
-
-        # Horizontal move.
-        if r1 == r2:
-            step = 1 if c2 > c1 else -1
-            for c in range(c1 + step, c2, step):
-                if board[r1][c] is not None:
-                    return False
+        if KING_ATTACKS[square] & pieces[KING]:
             return True
-
-        # Vertical move.
-        if c1 == c2:
-            step = 1 if r2 > r1 else -1
-            for r in range(r1 + step, r2, step):
-                if board[r][c1] is not None:
-                    return False
+        # A pawn attacks square if a pawn of the other color on square would attack the pawn.
+        if PAWN_ATTACKS[by_color ^ 1][square] & pieces[PAWN]:
+            return True
+        occupied = self.occupancy[WHITE] | self.occupancy[BLACK]
+        rooks = pieces[ROOK] | pieces[QUEEN]
+        if rooks and rook_attacks(square, occupied) & rooks:
+            return True
+        bishops = pieces[BISHOP] | pieces[QUEEN]
+        if bishops and bishop_attacks(square, occupied) & bishops:
             return True
-
         return False
 
+    def attackers_to(self, square, occupied):
+        """
+        Bitboard of the pieces of both colors attacking square, with sliders seeing through
+        everything not in occupied. Callers mask the result with occupied to drop removed pieces.
+        """
+        white = self.pieces[WHITE]
+        black = self.pieces[BLACK]
+        rooks = white[ROOK] | white[QUEEN] | black[ROOK] | black[QUEEN]
+        bishops = white[BISHOP] | white[QUEEN] | black[BISHOP] | black[QUEEN]
+        return (
+            (PAWN_ATTACKS[BLACK][square] & white[PAWN])
+            | (PAWN_ATTACKS[WHITE][square] & black[PAWN])
+            | (KNIGHT_ATTACKS[square] & (white[KNIGHT] | black[KNIGHT]))
+            | (KING_ATTACKS[square] & (white[KING] | black[KING]))
+            | (rook_attacks(square, occupied) & rooks)
+            | (bishop_attacks(square, occupied) & bishops)
+        )
+
+    def generate_captures(self):
+        """
+        Lazily yield the pseudo-legal captures and promotions of the side to move.
+        """
+        color = self.side_to_move
+        pieces = self.pieces[color]
+        enemy = self.occupancy[color ^ 1]
+        occupied = self.occupancy[WHITE] | self.occupancy[BLACK]
+
+        # Pawn captures (including en passant) and pushes to the last rank.
+        step = PAWN_DIRECTIONS[color]
+        targets_mask = enemy
+        if self.ep_square is not None:
+            targets_mask |= 1 << self.ep_square
+        bb = pieces[PAWN]
+        while bb:
+            bit = bb & -bb
+            bb ^= bit
+            from_sq = bit.bit_length() - 1
+            targets = [to_sq for to_sq in PAWN_CAPTURE_TARGETS[color][from_sq] if targets_mask >> to_sq & 1]
+            to_sq = from_sq + step
+            if (to_sq < 8 or to_sq >= 56) and not occupied >> to_sq & 1:
+                targets.append(to_sq)
+            for to_sq in targets:
+                if to_sq < 8 or to_sq >= 56:
+                    for promotion in PROMOTION_TYPES:
+                        yield from_sq | to_sq << 6 | promotion << 12
+                else:
+                    yield from_sq | to_sq << 6
+
+        for piece_type in (KNIGHT, BISHOP, ROOK, QUEEN, KING):
+            bb = pieces[piece_type]
+            while bb:
+                bit = bb & -bb
+                bb ^= bit
+                from_sq = bit.bit_length() - 1
+                if piece_type == KNIGHT:
+                    attacks = KNIGHT_ATTACKS[from_sq]
+                elif piece_type == BISHOP:
+                    attacks = bishop_attacks(from_sq, occupied)
+                elif piece_type == ROOK:
+                    attacks = rook_attacks(from_sq, occupied)
+                elif piece_type == QUEEN:
+                    attacks = rook_attacks(from_sq, occupied) | bishop_attacks(from_sq, occupied)
+                else:
+                    attacks = KING_ATTACKS[from_sq]
+                attacks &= enemy
+                while attacks:
+                    target = attacks & -attacks
+                    attacks ^= target
+                    yield from_sq | (target.bit_length() - 1) << 6
+
+    def generate_pseudo_legal_moves(self, from_mask=-1):
+        """
+        Lazily yield encoded moves for the side to move, ignoring checks.
+        from_mask limits the generation to pieces on the given bitboard of squares.
+        """
+        color = self.side_to_move
+        own = self.occupancy[color]
+        mailbox = self.mailbox
+        pieces = self.pieces[color]
+
+        # Pawns: single and double pushes, captures, en passant and promotions.
+        step = PAWN_DIRECTIONS[color]
+        start_row = PAWN_START_ROWS[color]
+        enemy = self.occupancy[color ^ 1]
+        ep_square = self.ep_square
+        bb = pieces[PAWN] & from_mask
+        while bb:
+            bit = bb & -bb
+            bb ^= bit
+            from_sq = bit.bit_length() - 1
+            targets = []
+            to_sq = from_sq + step
+            if 0 <= to_sq < 64 and mailbox[to_sq] is None:
+                targets.append(to_sq)
+                if from_sq >> 3 == start_row and mailbox[to_sq + step] is None:
+                    targets.append(to_sq + step)
+            for to_sq in PAWN_CAPTURE_TARGETS[color][from_sq]:
+                if enemy >> to_sq & 1 or to_sq == ep_square:
+                    targets.append(to_sq)
+            for to_sq in targets:
+                if to_sq < 8 or to_sq >= 56:
+                    for promotion in PROMOTION_TYPES:
+                        yield from_sq | to_sq << 6 | promotion << 12
+                else:
+                    yield from_sq | to_sq << 6
+
+        # Knights.
+        bb = pieces[KNIGHT] & from_mask
+        while bb:
+            bit = bb & -bb
+            bb ^= bit
+            from_sq = bit.bit_length() - 1
+            for to_sq in KNIGHT_TARGETS[from_sq]:
+                if not own >> to_sq & 1:
+                    yield from_sq | to_sq << 6
+
+        # Sliders walk each ray until they hit a piece.
+        for piece_type in (BISHOP, ROOK, QUEEN):
+            rays = SLIDER_RAYS[piece_type]
+            bb = pieces[piece_type] & from_mask
+            while bb:
+                bit = bb & -bb
+                bb ^= bit
+                from_sq = bit.bit_length() - 1
+                for ray in rays[from_sq]:
+                    for to_sq in ray:
+                        target = mailbox[to_sq]
+                        if target is None:
+                            yield from_sq | to_sq << 6
+                            continue
+                        if target[0] != color:
+                            yield from_sq | to_sq << 6
+                        break
+
+        # King steps and castling.
+        bb = pieces[KING] & from_mask
+        while bb:
+            bit = bb & -bb
+            bb ^= bit
+            from_sq = bit.bit_length() - 1
+            for to_sq in KING_TARGETS[from_sq]:
+                if not own >> to_sq & 1:
+                    yield from_sq | to_sq << 6
+            if self.castling:
+                # The king may not castle out of or through check; landing in check
+                # is caught by the legality filter like any other king move.
+                for to_sq, (right, king_from, _, _, empty_squares, king_path) in CASTLING_MOVES.items():
+                    if (
+                        self.castling & right
+                        and from_sq == king_from
+                        and all(mailbox[sq] is None for sq in empty_squares)
+                        and not any(self.is_square_attacked(sq, color ^ 1) for sq in king_path)
+                    ):
+                        yield from_sq | to_sq << 6
+
+    def pop(self):
+        """
+        Take back the last pushed move and return it.
+        """
+        move, captured, capture_sq, castling, ep_square, halfmove_clock, zobrist = self.history.pop()
+        from_sq = move & 63
+        to_sq = move >> 6 & 63
+        color, piece_type = self.mailbox[to_sq]
+        if move >> 12:
+            piece_type = PAWN
+
+        self.remove_piece(to_sq)
+        self.put_piece(from_sq, color, piece_type)
+        if piece_type == KING and abs(to_sq - from_sq) == 2:
+            _, _, rook_from, rook_to, _, _ = CASTLING_MOVES[to_sq]
+            self.remove_piece(rook_to)
+            self.put_piece(rook_from, color, ROOK)
+        if captured is not None:
+            self.put_piece(capture_sq, captured[0], captured[1])
+
+        self.castling = castling
+        self.ep_square = ep_square
+        self.halfmove_clock = halfmove_clock
+        if color == BLACK:
+            self.fullmove_number -= 1
+        self.side_to_move = color
+        self.zobrist = zobrist
+        if self.verify_hashes:
+            self.verify_zobrist()
+        return move
+
+
+class MoveCache:
+    """
+    Bounded LRU cache of legal move lists keyed by Zobrist key.
+    """
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        moves = self.entries.get(key)
+        if moves is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return moves
 
-class King(Piece):
-    def __init__(self, color):
-        super().__init__(color)
-        self.has_moved = False  # Added flag for castling
-
-    def __str__(self):
-        return 'K' if self.color == 'white' else 'k'
-
-    def is_valid_move(self, start, end, board, last_move=None):
-        r1, c1 = start
-        r2, c2 = end
-
-        # King moves one square in any direction.
-        if abs(r2 - r1) <= 1 and abs(c2 - c1) <= 1:
-            # Cannot capture your own piece.
-            if board[r2][c2] is not None and board[r2][c2].color == self.color:
-                return False
-            return True
-
-        # Castling.
-        if not self.has_moved and (r2, c2) in [(7, 2), (7, 6), (0, 2), (0, 6)]:
-            rook_col = 7 if c2 == 6 else 0  # Kingside (to column 6) or Queenside (to column 2)
-            rook = board[r2][rook_col]
-
-            if isinstance(rook, Rook) and not rook.has_moved:
-                # Ensure path is clear
-                if (
-                    c2 == 6 
-                    and board[r2][5] is None 
-                    and board[r2][6] is None 
-                ):  # Kingside
-                    return True
-                if (
-                    c2 == 2 
-                    and board[r2][1] is None 
-                    and board[r2][2] is None 
-                    and board[r2][3] is None
-                ):  # Queenside
-                    return True
-        return False
+    def put(self, key, moves):
+        self.entries[key] = moves
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
 
-    def move(self, start, end):
-        self.has_moved = True
+    def clear(self):
+        self.entries.clear()
 
 
 class Game:
     def __init__(self):
         self.board = self.create_board()
-        self.backup_board = copy.deepcopy(self.board)
         self.bottom_color = random.choice(['white', 'black'])
-        self.turn = 'white'  # White moves first.
         self.game_over = False
-        self.last_move = None  # Stores the last move for en passant.
-        self.white_king_pos = None
-        self.black_king_pos = None
+        self.last_move = None  # Stores the last move as (start, end).
+        self.pending_promotion = None  # (start, end) of a pawn move waiting for its promotion choice.
+        self.move_stack = []  # Game level undo records for pop().
+        self.move_cache = MoveCache()  # Legal moves per position, shared by the move queries.
+        self.status_cache = None  # ((zobrist, ply), status) from the last game_status() call.
         self.setup_pieces()
 
+    @property
+    def turn(self):
+        return COLOR_NAMES[self.board.side_to_move]
+
+    @property
+    def zobrist_key(self):
+        # 64-bit hash of the current position.
+        return self.board.zobrist
+
+    # King positions are tracked by the board as pieces move.
+    @property
+    def white_king_pos(self):
+        return self.find_king('white', self.board)
+
+    @property
+    def black_king_pos(self):
+        return self.find_king('black', self.board)
+
     def promote_pawn(self, pos, piece_type):
         """
         Promote the pawn to the specified piece type
         piece_type: 'Q' (Queen), 'R' (Rook), 'B' (Bishop), 'N' (Knight)
+        Completes the pending pawn move that ends on pos.
         """
-        r, c = pos
-        pawn = self.board[r][c]
-        if not isinstance(pawn, Pawn):
+        if self.pending_promotion is None or tuple(self.pending_promotion[1]) != tuple(pos):
             return False
-        
-        piece_map = {
-            'Q': Queen,
-            'R': Rook,
-            'B': Bishop,
-            'N': Knight
-        }
-        
-        if piece_type not in piece_map:
+
+        if piece_type not in PROMOTION_PIECES:
             return False
-            
-        # Update both the main board and the backup board
-        new_piece = piece_map[piece_type](pawn.color)
-        self.board[r][c] = new_piece
-        if hasattr(self, 'backup_board'):
-            self.backup_board[r][c] = new_piece
+
+        start, end = self.pending_promotion
+        self.push(self.encode_move(start, end, piece_type))
         return True
 
     def get_promotion_choices(self):
@@ -299,93 +736,178 @@ class Game:
         """
         return ['Q', 'R', 'B', 'N']
 
+    def is_valid_move(self, start, end, board):
+        """
+        Check whether the piece on start may move to end by its movement rules.
+        Does not consider whether the move leaves the own king in check.
+        """
+        if not self.pos_in_range(start) or not self.pos_in_range(end):
+            return False
+        to_sq = square_index(end)
+        for move in board.generate_pseudo_legal_moves(1 << square_index(start)):
+            if move >> 6 & 63 == to_sq:
+                return True
+        return False
+
+    def leaves_king_in_check(self, start, end, board):
+        # Try the move on the board, look for a check on the mover's king and take it back.
+        color, piece_type = board.piece_at(square_index(start))
+        promotion = 'Q' if piece_type == PAWN and end[0] in (0, 7) else None
+        board.push(self.encode_move(start, end, promotion))
+        in_check = self.is_check(COLOR_NAMES[color], board)
+        board.pop()
+        return in_check
+
+    def legal_moves(self, board, from_mask=-1):
+        """
+        Lazily yield the encoded legal moves of the side to move on board.
+        """
+        color = board.side_to_move
+        for move in board.generate_pseudo_legal_moves(from_mask):
+            board.push(move)
+            in_check = board.is_in_check(color)
+            board.pop()
+            if not in_check:
+                yield move
+
+    def legal_move_list(self, board):
+        """
+        Tuple of every legal move of the side to move on board.
+        Generated once per position and then served from the move cache.
+        """
+        moves = self.move_cache.get(board.zobrist)
+        if moves is None:
+            moves = tuple(self.legal_moves(board))
+            self.move_cache.put(board.zobrist, moves)
+        return moves
+
     def check_valid_moves(self, start, board):
-        piece = board[start[0]][start[1]]
-        if not isinstance(piece, Piece):
+        # Only the side to move has moves to make.
+        piece = self.get_piece_at(start, board)
+        if piece is None or piece[0] != board.side_to_move:
             return []
-        
+
+        from_sq = square_index(start)
         valid_moves = []
-        for i in range(8):
-            for j in range(8):
-                end = (i, j)
-                last_move = self.last_move
-                if piece.is_valid_move(start, end, board, last_move):
-                    temp_board = copy.deepcopy(board)
-                    # make move on temp board
-                    temp_board[end[0]][end[1]] = piece
-                    temp_board[start[0]][start[1]] = None
-                    if not self.is_check(piece.color, temp_board):
-                        valid_moves.append(end)
-        
+        for move in self.legal_move_list(board):
+            if move & 63 != from_sq:
+                continue
+            _, to_sq, promotion = decode_move(move)
+            # One (start, end) pair stands for every promotion choice.
+            if promotion in (0, QUEEN):
+                valid_moves.append(square_coords(to_sq))
+
         return valid_moves
 
     def all_valid_moves(self, color, board):
-        print("all_valid_moves")
         color = color.replace(" ", "").lower()
         if color not in ["white", "black"]:
             raise ValueError(f"color is {color}, Color must be 'black' or 'white'.")
-        
+        # Only the side to move has moves to make.
+        if color_index(color) != board.side_to_move:
+            return []
+
         valid_moves = []
-        for i in range(8):
-            for j in range(8):
-                start = (i,j)
-                piece = board[start[0]][start[1]]
-                if not isinstance(piece,Piece) or piece.color != color:
-                    continue
-                valid_ends = self.check_valid_moves(start, board)
-                for end in valid_ends:
-                    valid_moves.append((start, end))
-        
-        print(f"valid_moves: {valid_moves}")
+        for move in self.legal_move_list(board):
+            from_sq, to_sq, promotion = decode_move(move)
+            # One (start, end) pair stands for every promotion choice.
+            if promotion in (0, QUEEN):
+                valid_moves.append((square_coords(from_sq), square_coords(to_sq)))
+
         return valid_moves
 
+    def encode_move(self, start, end, promotion=None):
+        """
+        Encode a (row, col) move for push().
+        promotion: None or 'Q', 'R', 'B', 'N'
+        """
+        piece_type = PROMOTION_PIECES[promotion] if promotion else 0
+        return move_code(square_index(start), square_index(end), piece_type)
+
+    def push(self, move):
+        """
+        Play an encoded move on the game board.
+        The move must follow the piece's movement rules; pop() takes it back exactly.
+        """
+        from_sq, to_sq, _ = decode_move(move)
+        self.move_stack.append(self.last_move)
+        self.board.push(move)
+        # Stores last move for the front end.
+        self.last_move = (square_coords(from_sq), square_coords(to_sq))
+        self.pending_promotion = None
+
+    def pop(self):
+        """
+        Take back the last move played with push() and return it.
+        """
+        self.last_move = self.move_stack.pop()
+        return self.board.pop()
+
+    def perft(self, depth):
+        """
+        Count the leaf nodes of the legal move tree depth plies deep.
+        Used to check and time the move generator against published node counts.
+        """
+        if depth == 0:
+            return 1
+        board = self.board
+        nodes = 0
+        if depth == 1:
+            for _ in self.legal_moves(board):
+                nodes += 1
+            return nodes
+        for move in list(self.legal_moves(board)):
+            board.push(move)
+            nodes += self.perft(depth - 1)
+            board.pop()
+        return nodes
+
+    def divide(self, depth):
+        """
+        Perft split by root move: {'e2e4': nodes, ...}, for tracking down generator bugs.
+        """
+        board = self.board
+        counts = {}
+        for move in list(self.legal_moves(board)):
+            board.push(move)
+            counts[move_to_uci(move)] = self.perft(depth - 1)
+            board.pop()
+        return counts
+
+    def load_fen(self, fen):
+        # Replace the current position with the one described by fen.
+        self.board = Position.from_fen(fen)
+        self.last_move = None
+        self.pending_promotion = None
+        self.move_stack = []
+        self.status_cache = None
+
+    def get_fen(self):
+        return self.board.fen()
 
     def create_board(self):
-        # Create an 8x8 board initialized with None.
-        return [[None for _ in range(8)] for _ in range(8)]
+        # Create an empty bitboard position.
+        return Position()
 
     def get_board(self):
-        board_state = []
-        for row in self.board:
-            board_row = []
-            for piece in row:
-                if piece is None:
-                    board_row.append('.')
-                else:
-                    board_row.append(piece.__str__())
-            board_state.append(board_row)
-        return board_state
+        return self.board.to_grid()
 
     def setup_pieces(self):
         # With convert_position mapping, row 0 is rank 8 and row 7 is rank 1.
         # White pieces belong on ranks 1 and 2 (rows 7 and 6) and black pieces on ranks 7 and 8 (rows 1 and 0).
-        # White pieces:
-        self.board[7] = [
-            Rook('white'), Knight('white'), Bishop('white'), Queen('white'),
-            King('white'), Bishop('white'), Knight('white'), Rook('white')
-        ]
-        self.board[6] = [Pawn('white') for _ in range(8)]
-        self.white_king_pos = (7, 4)  # White king starts at e1.
-
-        # Black pieces:
-        self.board[0] = [
-            Rook('black'), Knight('black'), Bishop('black'), Queen('black'),
-            King('black'), Bishop('black'), Knight('black'), Rook('black')
-        ]
-        self.board[1] = [Pawn('black') for _ in range(8)]
-        self.black_king_pos = (0, 4)  # Black king starts at e8.
-
-        # Ensure rows 2 through 5 are empty.
-        for row in range(2, 6):
-            self.board[row] = [None for _ in range(8)]
+        back_rank = [ROOK, KNIGHT, BISHOP, QUEEN, KING, BISHOP, KNIGHT, ROOK]
+        for col, piece_type in enumerate(back_rank):
+            self.board.put_piece(square_index((7, col)), WHITE, piece_type)
+            self.board.put_piece(square_index((6, col)), WHITE, PAWN)
+            self.board.put_piece(square_index((0, col)), BLACK, piece_type)
+            self.board.put_piece(square_index((1, col)), BLACK, PAWN)
+        self.board.castling = WHITE_KINGSIDE | WHITE_QUEENSIDE | BLACK_KINGSIDE | BLACK_QUEENSIDE
+        self.board.zobrist = self.board.compute_zobrist()
 
     def display_board(self):
         # Display the board with ranks 8 to 1.
-        for row in self.board:
-            row_str = []
-            for piece in row:
-                row_str.append(str(piece) if piece is not None else '.')
-            print(" ".join(row_str))
+        for row in self.get_board():
+            print(" ".join(row))
         print()  # Blank line for spacing.
 
     # Check position not out of range
@@ -395,124 +917,63 @@ class Game:
         r, c = pos
         return 0 <= r < 8 and 0 <= c < 8
 
-    # Get piece at given position
+    # Get (color, piece_type) at given position
     def get_piece_at(self, pos, board):
-        r, c = pos
         if self.pos_in_range(pos):
-            return board[r][c]
+            return board.piece_at(square_index(pos))
         return None
 
-    # Handle pawn's en passant capture.
-    def en_passant(self, start, end):
-        piece = self.backup_board[end[0]][end[1]]
-        captured_row = start[0]
-        captured_col = end[1]
-        if (
-            isinstance(piece, Pawn)
-            and start[1] != end[1]
-            and self.board[end[0]][end[1]] is None
-            and isinstance(self.backup_board[captured_row][captured_col], Pawn)
-        ):
-            captured_row = start[0]
-            captured_col = end[1]
-            self.backup_board[captured_row][captured_col] = None
-            print(f"en passant, taken {captured_row, captured_col}")
-    
-    # Handle castling: if the piece is a King and it moves two squares horizontally,
-    # then move the associated rook.
-    def castle(self, start, end):
-        piece = self.backup_board[end[0]][end[1]]
-        if isinstance(piece, King) and abs(end[1] - start[1]) == 2 and start[0] == end[0]:
-            if end[1] == 6:  # Kingside
-                rook_start = (end[0], 7)
-                rook_end = (end[0], 5)
-            elif end[1] == 2:  # Queenside
-                rook_start = (end[0], 0)
-                rook_end = (end[0], 3)
-
-            self.backup_board[rook_end[0]][rook_end[1]] = self.backup_board[rook_start[0]][rook_start[1]]
-            self.backup_board[rook_start[0]][rook_start[1]] = None
+    def is_square_attacked(self, square, by_color, board):
+        # Check if any piece of by_color attacks the (row, col) square.
+        return board.is_square_attacked(square_index(square), color_index(by_color))
 
     def is_check(self, color, board):
         # Check if the king of the given color is under attack.
-        king_pos = self.find_king(color, board)
-        if king_pos is None:
-            return False
-        
-        opponent_color = 'black' if color == 'white' else 'white'
-        for r in range(8):
-            for c in range(8):
-                piece = board[r][c]
-                if piece is not None and piece.color == opponent_color:
-                    if piece.is_valid_move((r, c), king_pos, board, self.last_move):
-                        return True
-        return False
-    
+        return board.is_in_check(color_index(color))
+
     def find_king(self, color, board):
-        for r in range(8):
-            for c in range(8):
-                piece = board[r][c]
-                if isinstance(piece, King) and piece.color == color:
-                    return (r, c)
-        return None
+        king_square = board.king_squares[color_index(color)]
+        if king_square is None:
+            return None
+        return square_coords(king_square)
 
     def no_piece_can_move(self, color, board):
-        for r in range(8):
-            for c in range(8):
-                piece = board[r][c]
-                if piece is not None and piece.color == color:
-                    start = (r, c)
-                    for r2 in range(8):
-                        for c2 in range(8):
-                            end = (r2, c2)
-                            # Check if the piece can legally move.
-                            if piece.is_valid_move(start, end, board, self.last_move):
-                                # Backup the board state.
-                                backup_start = board[r][c]
-                                backup_end = board[r2][c2]
-                                original_white_king = self.white_king_pos
-                                original_black_king = self.black_king_pos
-
-                                # Make the move.
-                                board[r2][c2] = piece
-                                board[r][c] = None
-                                if isinstance(piece, King):
-                                    if piece.color == 'white':
-                                        self.white_king_pos = (r2, c2)
-                                    else:
-                                        self.black_king_pos = (r2, c2)
-                                # Check if the king is still in check.
-                                in_check = self.is_check(color, board)
-                                # Revert the move.
-                                board[r][c] = backup_start
-                                board[r2][c2] = backup_end
-                                self.white_king_pos = original_white_king
-                                self.black_king_pos = original_black_king
-                                if not in_check:
-                                    return False
-        return True
-
-    def is_checkmate(self, color):
-        # First, if the king is not in check, it's not checkmate.
-        if not self.is_check(color, self.board):
-            return False
+        # Only the side to move has moves to make.
+        if color_index(color) != board.side_to_move:
+            return True
+        return not self.legal_move_list(board)
 
-        return self.no_piece_can_move(color, self.board)
-    
-    def is_stalemate(self, color):
-        if self.is_check(color, self.board):
-            return False
+    def game_status(self):
+        """
+        Evaluate whether the game is over, generating the legal moves only once.
+        Returns 'ongoing', 'checkmate', 'stalemate' or a draw reason from DRAW_REASONS.
+        The result is cached until the position changes.
+        """
+        board = self.board
+        key = (board.zobrist, len(board.history))
+        if self.status_cache is not None and self.status_cache[0] == key:
+            return self.status_cache[1]
+
+        if not self.legal_move_list(board):
+            status = 'checkmate' if board.is_in_check(board.side_to_move) else 'stalemate'
+        elif board.halfmove_clock >= 100:
+            status = 'fifty_move_rule'
+        elif board.repetition_count() >= 3:
+            status = 'threefold_repetition'
+        elif board.has_insufficient_material():
+            status = 'insufficient_material'
+        else:
+            status = 'ongoing'
 
-        return self.no_piece_can_move(color, self.board)
+        self.status_cache = (key, status)
+        return status
 
+    def is_checkmate(self, color):
+        # Only the side to move can be checkmated.
+        return color_index(color) == self.board.side_to_move and self.game_status() == 'checkmate'
 
-    def update_king_position(self, start, end, piece):
-        # If a king moves, update its stored position.
-        if isinstance(piece, King):
-            if piece.color == 'white':
-                self.white_king_pos = end
-            else:
-                self.black_king_pos = end
+    def is_stalemate(self, color):
+        return color_index(color) == self.board.side_to_move and self.game_status() == 'stalemate'
 
 
 class LocalGame(Game):
@@ -563,53 +1024,27 @@ class LocalGame(Game):
             print("Invalid position(s). Please try again.\n")
             return
         
-        if not isinstance(self.board[start_pos[0]][start_pos[1]], Piece):
-            print(f"You can't start from an empty square.")
-            return
-
         piece = self.get_piece_at(start_pos, self.board)
         if piece is None:
             print("No piece at the starting position. Try again.\n")
             return
 
-        if piece.color != self.turn:
+        if COLOR_NAMES[piece[0]] != self.turn:
             print("You can only move your own pieces. Try again.\n")
             return
 
-        if not piece.is_valid_move(start_pos, end_pos, self.board, self.last_move):
-            if isinstance(piece, King):
-                print("Move would leave your king in check!")
-                print("King moves into check") # Debug
-                return
+        if not self.is_valid_move(start_pos, end_pos, self.board):
             print("Invalid move for that piece. Try again.\n")
             return
 
-        # Backup the current state in case we need to revert.
-        self.backup_board = copy.deepcopy(self.board)
-
-        # Execute the move on the backup board.
-        self.backup_board[end_pos[0]][end_pos[1]] = piece
-        self.backup_board[start_pos[0]][start_pos[1]] = None
-
-        self.en_passant(start_pos, end_pos)
-        self.castle(start_pos, end_pos)
-
-        # Update piece-specific state.
-        if hasattr(piece, 'move'):
-            piece.move(start_pos, end_pos)
-
-        # Update king position if needed.
-        self.update_king_position(start_pos, end_pos, piece)
-
         # Check that the move does not leave the current player's king in check.
-        if self.is_check(self.turn, self.backup_board):
+        if self.leaves_king_in_check(start_pos, end_pos, self.board):
             print("Move would leave your king in check!")
-            self.backup_board = copy.deepcopy(self.board)
-            print("Move leaves king in check") # Debug
             return
         
         # Check if promotion is needed
-        if isinstance(piece, Pawn) and piece.can_promote(end_pos):
+        promotion = None
+        if piece[1] == PAWN and end_pos[0] in (0, 7):
             print("Pawn can be promoted! Choose a piece type:")
             print("Q: Queen")
             print("R: Rook")
@@ -618,38 +1053,32 @@ class LocalGame(Game):
             while True:
                 choice = input("Enter your choice (Q/R/B/N): ").strip().upper()
                 if choice in self.get_promotion_choices():
-                    self.backup_board[end_pos[0]][end_pos[1]] = None  # Remove pawn
-                    self.promote_pawn(end_pos, choice)  # Promote to new piece
+                    promotion = choice
                     break
                 print("Invalid choice. Please try again.")
 
-        # Stores last move for en passant
-        self.last_move = (start_pos, end_pos)
-        # Make move by updating the entire board
-        self.board = copy.deepcopy(self.backup_board)
-        # Switch turns.
-        self.turn = 'black' if self.turn == 'white' else 'white'
+        # Make the move, which also switches turns.
+        self.push(self.encode_move(start_pos, end_pos, promotion))
 
-        # After switching turns, check if the new player is checkmated.
-        if self.is_checkmate(self.turn):
-            self.display_board()
+        # After switching turns, check if the game is over.
+        status = self.game_status()
+        if status == 'ongoing':
+            return
+
+        self.display_board()
+        if status == 'checkmate':
             print("Checkmate!")
             winner = 'white' if self.turn == 'black' else 'black'
             print(f"{winner.capitalize()} wins!")
-            choice = input("Enter 'quit' to exit or 'restart' to start a new game: ").strip().lower()
-            if choice == "restart":
-                self.__init__()  # Reinitialize the game.
-            else:
-                self.game_over = True
-        
-        if self.is_stalemate(self.turn):
-            self.display_board()
+        elif status == 'stalemate':
             print("Stalemate!")
-            choice = input("Enter 'quit' to exit or 'restart' to start a new game: ").strip().lower()
-            if choice == "restart":
-                self.__init__()  # Reinitialize the game.
-            else:
-                self.game_over = True
+        else:
+            print(f"Draw by {DRAW_REASONS[status]}!")
+        choice = input("Enter 'quit' to exit or 'restart' to start a new game: ").strip().lower()
+        if choice == "restart":
+            self.__init__()  # Reinitialize the game.
+        else:
+            self.game_over = True
 
     def play(self):
         while not self.game_over:
@@ -678,75 +1107,59 @@ class RemoteGame(Game):
         - "promotion_needed": Promotion needed
         - "checkmate": Checkmate
         - "stalemate": Stalemate
+        - "draw": Draw by rule, see game_status()
         """
         piece = self.get_piece_at(start, self.board)
-        if piece is None or piece.color != self.turn:
+        if piece is None or COLOR_NAMES[piece[0]] != self.turn:
             print(f"Invalid move: {start} to {end} by {self.turn}")
             return False
 
-        # Check if the pawn has reached the last rank
-        needs_promotion = False
-        if isinstance(piece, Pawn):
-            r2, _ = end
-            needs_promotion = (piece.color == 'white' and r2 == 0) or (piece.color == 'black' and r2 == 7)
-
-        # Validate move using piece logic (this should include normal moves, en passant, and castling checks).
-        if not piece.is_valid_move(start, end, self.board, self.last_move):
+        # Validate move by the piece's movement rules (this includes en passant and castling).
+        if not self.is_valid_move(start, end, self.board):
             print(f"Invalid move: {start} to {end} by {self.turn}")
             return False
 
-        # Backup the current state in case we need to revert.
-        self.backup_board = copy.deepcopy(self.board)
-
-        # Execute the move on the backup board.
-        self.backup_board[end[0]][end[1]] = piece
-        self.backup_board[start[0]][start[1]] = None
-
-        self.en_passant(start, end)
-        self.castle(start, end)
-
-        # Update piece-specific state.
-        if hasattr(piece, 'move'):
-            piece.move(start, end)
-
-        # Update king's position if necessary.
-        self.update_king_position(start, end, piece)
-
-        # If the move leaves the current player's king in check, revert the move.
-        if self.is_check(self.turn, self.backup_board):
+        # Reject the move if it leaves the current player's king in check.
+        if self.leaves_king_in_check(start, end, self.board):
             print(f"{self.turn} is in check")
-            self.backup_board = copy.deepcopy(self.board)
             return False
 
-        # Handle promotion
-        if needs_promotion:
+        # Handle promotion: the move is played once the piece type is chosen.
+        if piece[1] == PAWN and end[0] in (0, 7):
             print(f"Pawn at {end} needs promotion")  # Debug information
-            self.last_move = (start, end)  # Save the last move so that the frontend can continue after handling promotion
-            self.board = copy.deepcopy(self.backup_board)  # Update the main board
+            self.pending_promotion = (start, end)
             return "promotion_needed"
 
-        # Stores last move for en passant
-        self.last_move = (start, end)
-        # Make move by updating the entire board
-        self.board = copy.deepcopy(self.backup_board)
-        # Switch turns.
-        self.turn = 'black' if self.turn == 'white' else 'white'
+        # Make the move, which also switches turns.
+        self.push(self.encode_move(start, end))
 
-        # After a valid move, check if the opposing player is in checkmate.
-        if self.is_checkmate(self.turn):
-            self.game_over = True
+        # After a valid move, check if the game is over.
+        result = self.check_game_end()
+        if result:
+            return result
+    
+        print(f"Move successful: {start} to {end} by {self.turn}")
+        return True
+
+    def check_game_end(self):
+        """
+        Flag the game as over if the side to move is mated or the game is drawn.
+        Returns "checkmate", "stalemate", "draw" or None.
+        """
+        status = self.game_status()
+        if status == 'ongoing':
+            return None
+
+        self.game_over = True
+        if status == 'checkmate':
             winner = 'white' if self.turn == 'black' else 'black'
             print(f"Checkmate! {winner.capitalize()} wins!")
             return "checkmate"
-
-        # Check if opposite player is in stalemate
-        if self.is_stalemate(self.turn):
-            self.game_over = True
+        if status == 'stalemate':
             print("Stalemate!")
             return "stalemate"
-    
-        print(f"Move successful: {start} to {end} by {self.turn}")
-        return True
+        print(f"Draw by {DRAW_REASONS[status]}!")
+        return "draw"
 
     def handle_promotion(self, pos, piece_type):
         """
@@ -755,19 +1168,13 @@ class RemoteGame(Game):
         if piece_type not in self.get_promotion_choices():
             return False
         
-        # Execute promotion
+        # Execute promotion, which completes the move and switches turns
         result = self.promote_pawn(pos, piece_type)
         if result:
-            # Switch turns after successful promotion
-            self.turn = 'black' if self.turn == 'white' else 'white'
-            
-            # Check for checkmate or stalemate
-            if self.is_checkmate(self.turn):
-                self.game_over = True
-                return "checkmate"
-            if self.is_stalemate(self.turn):
-                self.game_over = True
-                return "stalemate"
+            # Check for checkmate, stalemate or a draw
+            end_result = self.check_game_end()
+            if end_result:
+                return end_result
             
             # If it's the AI's turn, trigger AI move
             if self.bot_enabled and self.turn == self.ai_color:
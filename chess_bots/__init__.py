@@ -1 +1 @@
-__all__ = ['random_bot','bot1', 'bot2']  # Optional: defines what 'from chess_bot import *' includes
\ No newline at end of file
+__all__ = ['random_bot','bot1', 'bot2', 'search_bot']  # Optional: defines what 'from chess_bot import *' includes
\ No newline at end of file
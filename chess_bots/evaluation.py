@@ -0,0 +1,248 @@
+"""
+Evaluators for search bots.
+Every evaluator has the same interface so bots can swap them:
+    reset(board)        start tracking a position
+    push(board, move)   play a move on board and update the evaluator
+    pop(board)          take the last move back
+    evaluate(board)     score in centipawns from the side to move's point of view
+
+IncrementalEvaluator keeps material plus piece-square-table (PST) totals for the
+middlegame and endgame as running sums, so evaluating a leaf costs O(1).
+The two totals are blended by game phase (remaining non-pawn material).
+"""
+from chess import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, WHITE, BLACK, CASTLING_MOVES
+
+# Piece values indexed by piece type.
+MATERIAL_VALUES = [100, 320, 330, 500, 900, 0]
+MG_VALUES = [82, 337, 365, 477, 1025, 0]
+EG_VALUES = [94, 281, 297, 512, 936, 0]
+
+# Contribution of each piece type to the game phase; 24 is the full opening set.
+PHASE_WEIGHTS = [0, 1, 1, 2, 4, 0]
+MAX_PHASE = 24
+
+# Piece-square tables from white's point of view, listed from a8 to h1 like the board squares.
+# Black uses the table mirrored vertically (square ^ 56).
+MG_PST = [
+    [  # Pawn
+        0, 0, 0, 0, 0, 0, 0, 0,
+        98, 134, 61, 95, 68, 126, 34, -11,
+        -6, 7, 26, 31, 65, 56, 25, -20,
+        -14, 13, 6, 21, 23, 12, 17, -23,
+        -27, -2, -5, 12, 17, 6, 10, -25,
+        -26, -4, -4, -10, 3, 3, 33, -12,
+        -35, -1, -20, -23, -15, 24, 38, -22,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ],
+    [  # Knight
+        -167, -89, -34, -49, 61, -97, -15, -107,
+        -73, -41, 72, 36, 23, 62, 7, -17,
+        -47, 60, 37, 65, 84, 129, 73, 44,
+        -9, 17, 19, 53, 37, 69, 18, 22,
+        -13, 4, 16, 13, 28, 19, 21, -8,
+        -23, -9, 12, 10, 19, 17, 25, -16,
+        -29, -53, -12, -3, -1, 18, -14, -19,
+        -105, -21, -58, -33, -17, -28, -19, -23,
+    ],
+    [  # Bishop
+        -29, 4, -82, -37, -25, -42, 7, -8,
+        -26, 16, -18, -13, 30, 59, 18, -47,
+        -16, 37, 43, 40, 35, 50, 37, -2,
+        -4, 5, 19, 50, 37, 37, 7, -2,
+        -6, 13, 13, 26, 34, 12, 10, 4,
+        0, 15, 15, 15, 14, 27, 18, 10,
+        4, 15, 16, 0, 7, 21, 33, 1,
+        -33, -3, -14, -21, -13, -12, -39, -21,
+    ],
+    [  # Rook
+        32, 42, 32, 51, 63, 9, 31, 43,
+        27, 32, 58, 62, 80, 67, 26, 44,
+        -5, 19, 26, 36, 17, 45, 61, 16,
+        -24, -11, 7, 26, 24, 35, -8, -20,
+        -36, -26, -12, -1, 9, -7, 6, -23,
+        -45, -25, -16, -17, 3, 0, -5, -33,
+        -44, -16, -20, -9, -1, 11, -6, -71,
+        -19, -13, 1, 17, 16, 7, -37, -26,
+    ],
+    [  # Queen
+        -28, 0, 29, 12, 59, 44, 43, 45,
+        -24, -39, -5, 1, -16, 57, 28, 54,
+        -13, -17, 7, 8, 29, 56, 47, 57,
+        -27, -27, -16, -16, -1, 17, -2, 1,
+        -9, -26, -9, -10, -2, -4, 3, -3,
+        -14, 2, -11, -2, -5, 2, 14, 5,
+        -35, -8, 11, 2, 8, 15, -3, 1,
+        -1, -18, -9, 10, -15, -25, -31, -50,
+    ],
+    [  # King
+        -65, 23, 16, -15, -56, -34, 2, 13,
+        29, -1, -20, -7, -8, -4, -38, -29,
+        -9, 24, 2, -16, -20, 6, 22, -22,
+        -17, -20, -12, -27, -30, -25, -14, -36,
+        -49, -1, -27, -39, -46, -44, -33, -51,
+        -14, -14, -22, -46, -44, -30, -15, -27,
+        1, 7, -8, -64, -43, -16, 9, 8,
+        -15, 36, 12, -54, 8, -28, 24, 14,
+    ],
+]
+
+EG_PST = [
+    [  # Pawn
+        0, 0, 0, 0, 0, 0, 0, 0,
+        178, 173, 158, 134, 147, 132, 165, 187,
+        94, 100, 85, 67, 56, 53, 82, 84,
+        32, 24, 13, 5, -2, 4, 17, 17,
+        13, 9, -3, -7, -7, -8, 3, -1,
+        4, 7, -6, 1, 0, -5, -1, -8,
+        13, 8, 8, 10, 13, 0, 2, -7,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ],
+    [  # Knight
+        -58, -38, -13, -28, -31, -27, -63, -99,
+        -25, -8, -25, -2, -9, -25, -24, -52,
+        -24, -20, 10, 9, -1, -9, -19, -41,
+        -17, 3, 22, 22, 22, 11, 8, -18,
+        -18, -6, 16, 25, 16, 17, 4, -18,
+        -23, -3, -1, 15, 10, -3, -20, -22,
+        -42, -20, -10, -5, -2, -20, -23, -44,
+        -29, -51, -23, -15, -22, -18, -50, -64,
+    ],
+    [  # Bishop
+        -14, -21, -11, -8, -7, -9, -17, -24,
+        -8, -4, 7, -12, -3, -13, -4, -14,
+        2, -8, 0, -1, -2, 6, 0, 4,
+        -3, 9, 12, 9, 14, 10, 3, 2,
+        -6, 3, 13, 19, 7, 10, -3, -9,
+        -12, -3, 8, 10, 13, 3, -7, -15,
+        -14, -18, -7, -1, 4, -9, -15, -27,
+        -23, -9, -23, -5, -9, -16, -5, -17,
+    ],
+    [  # Rook
+        13, 10, 18, 15, 12, 12, 8, 5,
+        11, 13, 13, 11, -3, 3, 8, 3,
+        7, 7, 7, 5, 4, -3, -5, -3,
+        4, 3, 13, 1, 2, 1, -1, 2,
+        3, 5, 8, 4, -5, -6, -8, -11,
+        -4, 0, -5, -1, -7, -12, -8, -16,
+        -6, -6, 0, 2, -9, -9, -11, -3,
+        -9, 2, 3, -1, -5, -13, 4, -20,
+    ],
+    [  # Queen
+        -9, 22, 22, 27, 27, 19, 10, 20,
+        -17, 20, 32, 41, 58, 25, 30, 0,
+        -20, 6, 9, 49, 47, 35, 19, 9,
+        3, 22, 24, 45, 57, 40, 57, 36,
+        -18, 28, 19, 47, 31, 34, 39, 23,
+        -16, -27, 15, 6, 9, 17, 10, 5,
+        -22, -23, -30, -16, -16, -23, -36, -32,
+        -33, -28, -22, -43, -5, -32, -20, -41,
+    ],
+    [  # King
+        -74, -35, -18, -18, -11, 15, 4, -17,
+        -12, 17, 14, 17, 17, 38, 23, 11,
+        10, 17, 23, 15, 20, 45, 44, 13,
+        -8, 22, 24, 27, 26, 33, 26, 3,
+        -18, -4, 21, 24, 27, 23, 9, -11,
+        -19, -3, 11, 21, 23, 16, 7, -9,
+        -27, -11, 4, 13, 14, 4, -5, -17,
+        -53, -34, -21, -11, -28, -14, -24, -43,
+    ],
+]
+
+
+def _signed_tables(values, pst):
+    # tables[color][piece_type][square]: piece value plus PST bonus, negative for black.
+    white = [[values[piece_type] + pst[piece_type][square] for square in range(64)] for piece_type in range(6)]
+    black = [[-(values[piece_type] + pst[piece_type][square ^ 56]) for square in range(64)] for piece_type in range(6)]
+    return [white, black]
+
+
+MG_TABLES = _signed_tables(MG_VALUES, MG_PST)
+EG_TABLES = _signed_tables(EG_VALUES, EG_PST)
+
+
+class MaterialEvaluator:
+    """
+    Plain material count, recomputed from the bitboards on every call.
+    """
+    def reset(self, board):
+        pass
+
+    def push(self, board, move):
+        board.push(move)
+
+    def pop(self, board):
+        return board.pop()
+
+    def evaluate(self, board):
+        score = 0
+        for piece_type in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN):
+            count = board.pieces[WHITE][piece_type].bit_count() - board.pieces[BLACK][piece_type].bit_count()
+            score += MATERIAL_VALUES[piece_type] * count
+        return score if board.side_to_move == WHITE else -score
+
+
+class IncrementalEvaluator:
+    """
+    Tapered material + PST evaluation kept as running totals.
+    push() works out the change from the move before playing it; pop() restores the saved totals.
+    """
+    def __init__(self):
+        self.mg = 0  # Middlegame score, white minus black.
+        self.eg = 0  # Endgame score, white minus black.
+        self.phase = 0
+        self.stack = []
+
+    def reset(self, board):
+        self.mg = self.eg = self.phase = 0
+        self.stack = []
+        for square, piece in enumerate(board.mailbox):
+            if piece is not None:
+                color, piece_type = piece
+                self.mg += MG_TABLES[color][piece_type][square]
+                self.eg += EG_TABLES[color][piece_type][square]
+                self.phase += PHASE_WEIGHTS[piece_type]
+
+    def push(self, board, move):
+        from_sq = move & 63
+        to_sq = move >> 6 & 63
+        promotion = move >> 12
+        color, piece_type = board.mailbox[from_sq]
+        mg_table = MG_TABLES[color]
+        eg_table = EG_TABLES[color]
+        mg, eg, phase = self.mg, self.eg, self.phase
+        self.stack.append((mg, eg, phase))
+
+        # Move the piece, promoting it if needed.
+        new_type = promotion or piece_type
+        mg += mg_table[new_type][to_sq] - mg_table[piece_type][from_sq]
+        eg += eg_table[new_type][to_sq] - eg_table[piece_type][from_sq]
+        phase += PHASE_WEIGHTS[new_type] - PHASE_WEIGHTS[piece_type]
+
+        # Remove the captured piece, which sits behind the target square for en passant.
+        capture_sq = to_sq
+        if piece_type == PAWN and to_sq == board.ep_square:
+            capture_sq = to_sq + 8 if color == WHITE else to_sq - 8
+        captured = board.mailbox[capture_sq]
+        if captured is not None:
+            mg -= MG_TABLES[captured[0]][captured[1]][capture_sq]
+            eg -= EG_TABLES[captured[0]][captured[1]][capture_sq]
+            phase -= PHASE_WEIGHTS[captured[1]]
+
+        # Castling also moves the rook.
+        if piece_type == KING and abs(to_sq - from_sq) == 2:
+            _, _, rook_from, rook_to, _, _ = CASTLING_MOVES[to_sq]
+            mg += mg_table[ROOK][rook_to] - mg_table[ROOK][rook_from]
+            eg += eg_table[ROOK][rook_to] - eg_table[ROOK][rook_from]
+
+        board.push(move)
+        self.mg, self.eg, self.phase = mg, eg, phase
+
+    def pop(self, board):
+        self.mg, self.eg, self.phase = self.stack.pop()
+        return board.pop()
+
+    def evaluate(self, board):
+        phase = min(self.phase, MAX_PHASE)
+        score = (self.mg * phase + self.eg * (MAX_PHASE - phase)) // MAX_PHASE
+        return score if board.side_to_move == WHITE else -score
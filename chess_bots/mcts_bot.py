@@ -0,0 +1,406 @@
+"""
+Monte Carlo tree search bot (PUCT), requires numpy.
+The tree lives in preallocated arrays indexed by node number instead of per-node objects.
+The children of a node occupy one contiguous block [first_child, first_child + num_children),
+so selecting a child is a handful of vector operations over that block.
+After a move the subtree under the position actually reached is kept for the next search.
+Leaves are valued with the incremental evaluator of chess_bots.evaluation, squashed to [-1, 1].
+
+With batch_size K > 1 each iteration instead selects K leaves, using virtual loss to spread them
+over different branches, encodes them into one observation batch and evaluates them with a single
+batch_evaluator(observations, masks) -> (policy, values) call (see heuristic_batch_evaluator).
+load_network() makes the bot use a chess_rl.network.PolicyValueNetwork for this.
+"""
+import math
+import time
+
+import numpy as np
+
+from chess import Game, WHITE, BLACK, START_FEN, PIECE_SYMBOLS, decode_move, square_coords
+from chess_bots.evaluation import IncrementalEvaluator
+from chess_rl.actions import ACTION_SIZE, MOVE_TO_ACTION
+from chess_rl.batch_eval import NUM_PLANES, evaluate_planes
+from chess_rl.encoder import NUM_CHANNELS, SIDE_PLANE, ObservationEncoder
+from chess_rl.network import PolicyValueNetwork
+
+SIMULATIONS = 800
+MAX_NODES = 1 << 20
+C_PUCT = 1.5
+FPU_REDUCTION = 0.2  # Unvisited children are assumed this much worse than their parent.
+VALUE_SCALE = 400.0  # Centipawns for a value of tanh(1).
+VIRTUAL_LOSS = 1.0  # Value taken off every node on a pending leaf's path until its result is backed up.
+
+# Node states.
+UNEXPANDED = 0
+EXPANDED = 1
+TERMINAL = 2
+
+
+class TreeFull(Exception):
+    pass
+
+
+def heuristic_batch_evaluator(observations, masks):
+    """
+    Default batch evaluator: uniform policy over the legal actions and a value from the NumPy
+    material/PST/mobility evaluation of chess_rl.batch_eval, for the side to move.
+    """
+    side_to_move = np.where(observations[:, SIDE_PLANE, 0, 0] > 0, WHITE, BLACK)
+    values = np.tanh(evaluate_planes(observations[:, :NUM_PLANES], side_to_move) / VALUE_SCALE)
+    policy = masks / np.maximum(masks.sum(axis=1, keepdims=True), 1)
+    return policy, values
+
+
+class MCTS:
+    """
+    Values are stored from the point of view of the player who made the move into the node,
+    so a parent picks the child with the highest mean value.
+    """
+    def __init__(self, simulations=SIMULATIONS, max_nodes=MAX_NODES, c_puct=C_PUCT, time_limit=None,
+                 batch_size=1, batch_evaluator=None):
+        self.simulations = simulations
+        self.batch_size = batch_size
+        self.batch_evaluator = batch_evaluator
+        self.c_puct = c_puct
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.visits = np.zeros(max_nodes, dtype=np.int32)
+        self.value_sum = np.zeros(max_nodes, dtype=np.float32)
+        self.prior = np.zeros(max_nodes, dtype=np.float32)
+        self.move = np.zeros(max_nodes, dtype=np.int32)
+        self.first_child = np.zeros(max_nodes, dtype=np.int32)
+        self.num_children = np.zeros(max_nodes, dtype=np.int32)
+        self.state = np.zeros(max_nodes, dtype=np.int8)
+        self.terminal_value = np.zeros(max_nodes, dtype=np.float32)  # For the side to move at the node.
+        self.evaluator = IncrementalEvaluator()
+        self.encoder = None
+        self.observations = None
+        self.masks = None
+        self.node_count = 0
+        self.root_key = None  # (zobrist, ply) of the position the tree was searched from.
+        self.stats = {}
+        self.clear()
+
+    def clear(self):
+        self.node_count = 1
+        self._reset_nodes(0, 1)
+        self.root_key = None
+
+    def _reset_nodes(self, start, stop):
+        self.visits[start:stop] = 0
+        self.value_sum[start:stop] = 0
+        self.prior[start:stop] = 0
+        self.move[start:stop] = 0
+        self.first_child[start:stop] = 0
+        self.num_children[start:stop] = 0
+        self.state[start:stop] = UNEXPANDED
+
+    def search(self, game):
+        """
+        Run the simulation budget from game's position and return the most visited encoded move,
+        or None if there are no moves.
+        """
+        board = game.board.copy()
+        start_time = time.perf_counter()
+        reused = self._reuse_tree(board)
+        self.root_key = (board.zobrist, len(board.history))
+
+        simulations = 0
+        self.batches = 0
+        self.collisions = 0
+        self.eval_time = 0.0
+        batched = self.batch_size > 1 or self.batch_evaluator is not None
+        self.evaluator.reset(board)
+        try:
+            if self.state[0] == UNEXPANDED:
+                if batched:
+                    self.simulate_batch(game, board, 1)
+                else:
+                    self._backup([0], self._expand(0, game, board))
+            while simulations < self.simulations:
+                if self.time_limit is not None and time.perf_counter() - start_time >= self.time_limit:
+                    break
+                if batched:
+                    simulations += self.simulate_batch(game, board, self.simulations - simulations)
+                else:
+                    self.simulate(game, board)
+                    simulations += 1
+        except TreeFull:
+            pass
+
+        elapsed = time.perf_counter() - start_time
+        if self.state[0] != EXPANDED:
+            return None
+        start = self.first_child[0]
+        children = slice(start, start + self.num_children[0])
+        best = start + int(np.argmax(self.visits[children]))
+        self.stats = {
+            'simulations': simulations,
+            'time': elapsed,
+            'sims_per_second': simulations / elapsed if elapsed > 0 else 0,
+            'nodes': self.node_count,
+            'reused': reused,
+            'visits': int(self.visits[best]),
+            'value': float(self.value_sum[best] / max(self.visits[best], 1)),
+            'batch_size': self.batch_size if batched else 1,
+            'batches': self.batches,
+            'collisions': self.collisions,
+            'eval_time': self.eval_time,
+        }
+        return int(self.move[best])
+
+    def simulate(self, game, board):
+        # Walk down to a leaf, expand it, back the value up and restore the board.
+        node = 0
+        path = [0]
+        while self.state[node] == EXPANDED:
+            node = self._select_child(node)
+            self.evaluator.push(board, int(self.move[node]))
+            path.append(node)
+        if self.state[node] == TERMINAL:
+            value = float(self.terminal_value[node])
+        else:
+            value = self._expand(node, game, board)
+        self._backup(path, value)
+        for _ in range(len(path) - 1):
+            self.evaluator.pop(board)
+
+    def simulate_batch(self, game, board, limit):
+        """
+        Select up to min(batch_size, limit) leaves under virtual loss, evaluate them in one
+        batch_evaluator call, expand them and back up their values. Returns the simulations done.
+        """
+        count = min(self.batch_size, limit)
+        observations, masks = self._batch_buffers()
+        leaves = []  # (path, node, actions) of the leaves waiting for evaluation.
+        pending = set()
+        done = 0
+        attempts = 0
+        while len(leaves) + done < count and attempts < 2 * count:
+            attempts += 1
+            node = 0
+            path = [0]
+            while self.state[node] == EXPANDED:
+                node = self._select_child(node)
+                board.push(int(self.move[node]))
+                path.append(node)
+            path = np.asarray(path)
+            self.visits[path] += 1
+            self.value_sum[path] -= VIRTUAL_LOSS
+
+            if node in pending:
+                # Two paths reached the same leaf; undo this one's virtual loss.
+                self.visits[path] -= 1
+                self.value_sum[path] += VIRTUAL_LOSS
+                self.collisions += 1
+            elif self.state[node] == TERMINAL:
+                self._finish(path, float(self.terminal_value[node]))
+                done += 1
+            else:
+                value, moves = self._leaf_moves(node, game, board)
+                if value is not None:
+                    self._finish(path, value)
+                    done += 1
+                else:
+                    index = len(leaves)
+                    actions = MOVE_TO_ACTION[np.fromiter(moves, dtype=np.int32, count=len(moves))]
+                    self.encoder.encode(board, observations[index])
+                    masks[index].fill(False)
+                    masks[index, actions] = True
+                    leaves.append((path, node, moves, actions))
+                    pending.add(node)
+            for _ in range(len(path) - 1):
+                board.pop()
+
+        if leaves:
+            # Every leaf must fit before any is expanded, or the rest would keep their virtual loss.
+            if self.node_count + sum(len(moves) for _, _, moves, _ in leaves) > self.max_nodes:
+                for path, _, _, _ in leaves:
+                    self.visits[path] -= 1
+                    self.value_sum[path] += VIRTUAL_LOSS
+                raise TreeFull()
+            start_time = time.perf_counter()
+            evaluator = self.batch_evaluator or heuristic_batch_evaluator
+            policy, values = evaluator(observations[:len(leaves)], masks[:len(leaves)])
+            self.eval_time += time.perf_counter() - start_time
+            self.batches += 1
+            for index, (path, node, moves, actions) in enumerate(leaves):
+                priors = policy[index, actions]
+                total = priors.sum()
+                self._add_children(node, moves, priors / total if total > 0 else 1.0 / len(moves))
+                self._finish(path, float(values[index]))
+        return done + len(leaves)
+
+    def _batch_buffers(self):
+        if self.observations is None or len(self.observations) < self.batch_size:
+            self.encoder = ObservationEncoder()
+            self.observations = np.zeros((self.batch_size, NUM_CHANNELS, 8, 8), dtype=np.float32)
+            self.masks = np.zeros((self.batch_size, ACTION_SIZE), dtype=bool)
+        return self.observations, self.masks
+
+    def _finish(self, path, value):
+        # Back up a leaf selected under virtual loss; its visits were already counted.
+        signs = np.where(np.arange(len(path))[::-1] % 2 == 0, -1.0, 1.0)
+        self.value_sum[path] += (signs * value + VIRTUAL_LOSS).astype(np.float32)
+
+    def _select_child(self, node):
+        start = self.first_child[node]
+        stop = start + self.num_children[node]
+        visits = self.visits[start:stop]
+        parent_visits = self.visits[node]
+        # The node's own mean value is stored for the player who moved into it, i.e. the opponent.
+        fpu = -self.value_sum[node] / max(parent_visits, 1) - FPU_REDUCTION
+        q = np.where(visits > 0, self.value_sum[start:stop] / np.maximum(visits, 1), fpu)
+        u = self.c_puct * math.sqrt(parent_visits) * self.prior[start:stop] / (1 + visits)
+        return start + int(np.argmax(q + u))
+
+    def _expand(self, node, game, board):
+        """
+        Add the children of node and return the value of the position for its side to move.
+        """
+        value, moves = self._leaf_moves(node, game, board)
+        if value is not None:
+            return value
+        self._add_children(node, moves, 1.0 / len(moves))
+        return math.tanh(self.evaluator.evaluate(board) / VALUE_SCALE)
+
+    def _leaf_moves(self, node, game, board):
+        """
+        Returns (value, None) and marks node terminal if the game is over there, else (None, legal moves).
+        """
+        # Repeating a position is scored as a draw inside the tree, but the root is always searched.
+        if node != 0 and (board.halfmove_clock >= 100 or board.repetition_count() >= 2
+                          or board.has_insufficient_material()):
+            return self._set_terminal(node, 0.0), None
+        moves = game.legal_move_list(board)
+        if not moves:
+            return self._set_terminal(node, -1.0 if board.is_in_check(board.side_to_move) else 0.0), None
+        return None, moves
+
+    def _add_children(self, node, moves, priors):
+        count = len(moves)
+        start = self.node_count
+        if start + count > self.max_nodes:
+            raise TreeFull()
+        self.node_count += count
+        self._reset_nodes(start, start + count)
+        self.move[start:start + count] = moves
+        self.prior[start:start + count] = priors
+        self.first_child[node] = start
+        self.num_children[node] = count
+        self.state[node] = EXPANDED
+
+    def _set_terminal(self, node, value):
+        self.state[node] = TERMINAL
+        self.terminal_value[node] = value
+        return value
+
+    def _backup(self, path, value):
+        # value is for the side to move at the leaf; the leaf's own entry is for the player who moved into it.
+        path = np.asarray(path)
+        signs = np.where(np.arange(len(path))[::-1] % 2 == 0, -1.0, 1.0)
+        self.visits[path] += 1
+        self.value_sum[path] += (signs * value).astype(np.float32)
+
+    def _reuse_tree(self, board):
+        """
+        If the moves played since the last search lead to a node of the tree, make it the new root
+        and drop everything else. Returns the number of nodes kept.
+        """
+        if self.root_key is None:
+            self.clear()
+            return 0
+        root_zobrist, root_ply = self.root_key
+        history = board.history
+        # With no moves played since, the root is the current position itself.
+        zobrist = history[root_ply][6] if len(history) > root_ply else board.zobrist
+        if len(history) < root_ply or zobrist != root_zobrist:
+            self.clear()
+            return 0
+        node = 0
+        for record in history[root_ply:]:
+            if self.state[node] != EXPANDED:
+                self.clear()
+                return 0
+            start = self.first_child[node]
+            children = self.move[start:start + self.num_children[node]]
+            matches = np.flatnonzero(children == record[0])
+            if not len(matches):
+                self.clear()
+                return 0
+            node = start + int(matches[0])
+        if self.state[node] != EXPANDED:
+            self.clear()
+            return 0
+        self._compact(node)
+        return self.node_count
+
+    def _compact(self, root):
+        # Copy the subtree under root to the front of the arrays, level by level, keeping child blocks contiguous.
+        order = [np.array([root])]
+        frontier = order[0]
+        while len(frontier):
+            expanded = frontier[self.state[frontier] == EXPANDED]
+            counts = self.num_children[expanded]
+            offsets = np.repeat(self.first_child[expanded] - (np.cumsum(counts) - counts), counts)
+            frontier = np.arange(counts.sum()) + offsets
+            order.append(frontier)
+        order = np.concatenate(order)
+        new_index = np.zeros(self.node_count, dtype=np.int32)
+        new_index[order] = np.arange(len(order), dtype=np.int32)
+
+        for array in (self.visits, self.value_sum, self.prior, self.move, self.num_children, self.state,
+                      self.terminal_value):
+            array[:len(order)] = array[order]
+        first_child = self.first_child[order]
+        self.first_child[:len(order)] = np.where(self.state[:len(order)] == EXPANDED, new_index[first_child], 0)
+        self.node_count = len(order)
+
+
+def benchmark_batch_sizes(fen=START_FEN, batch_sizes=(1, 4, 16, 64), simulations=SIMULATIONS, batch_evaluator=None):
+    """
+    Search one position with each batch size and print the simulations per second.
+    """
+    game = Game()
+    game.load_fen(fen)
+    for batch_size in batch_sizes:
+        searcher = MCTS(simulations=simulations, max_nodes=simulations * 64, batch_size=batch_size,
+                        batch_evaluator=batch_evaluator or heuristic_batch_evaluator)
+        searcher.search(game)
+        stats = searcher.stats
+        per_batch = stats['eval_time'] / max(stats['batches'], 1)
+        print(f"batch size {batch_size:>3}: {stats['sims_per_second']:>7.0f} sims/s, {stats['batches']} batches, "
+              f"{per_batch * 1000:.2f} ms per batch evaluation, {stats['collisions']} collisions")
+
+
+tree = MCTS()
+_promotion_choice = 'Q'
+
+
+def load_network(path, batch_size=16):
+    """
+    Evaluate the bot's leaves with the network weights in the .npz file at path, batch_size at a time.
+    """
+    tree.batch_size = batch_size
+    tree.batch_evaluator = PolicyValueNetwork.load(path, max_batch=batch_size)
+    tree.clear()
+
+
+def get_bot_move(game):
+    global _promotion_choice
+    if game.turn == game.ai_color:
+        move = tree.search(game)
+        if move is None:
+            return None
+        stats = tree.stats
+        print(f"mcts_bot: {stats['simulations']} simulations in {stats['time']:.2f}s "
+              f"({stats['sims_per_second']:.0f} sims/s), {stats['nodes']} nodes ({stats['reused']} reused), "
+              f"best move {stats['visits']} visits, value {stats['value']:+.2f}")
+        from_sq, to_sq, promotion = decode_move(move)
+        _promotion_choice = PIECE_SYMBOLS[promotion] if promotion else 'Q'
+        return square_coords(from_sq), square_coords(to_sq)
+    return None
+
+def handle_promotion():
+    """Handle the bot's pawn promotion"""
+    return _promotion_choice  # The piece chosen by the last search
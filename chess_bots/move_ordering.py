@@ -0,0 +1,96 @@
+"""
+Move ordering for search bots.
+Scores moves so alpha-beta looks at the likely best ones first:
+the transposition table move, then captures and promotions by MVV-LVA
+(most valuable victim, least valuable attacker), then killer moves, then
+quiet moves by their history score.
+"""
+from chess import PAWN, QUEEN
+
+TT_MOVE_SCORE = 1000000
+CAPTURE_SCORE = 100000
+KILLER_SCORES = (90000, 80000)
+HISTORY_LIMIT = 50000  # History scores are halved once one gets this large.
+MAX_PLY = 128
+
+# Victim and attacker ranks indexed by piece type (pawn, knight, bishop, rook, queen, king).
+MVV_LVA_VALUES = [1, 3, 3, 5, 9, 0]
+
+
+class MoveOrderer:
+    def __init__(self):
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        # history[color * 6 + piece_type][to_square]
+        self.history = [[0] * 64 for _ in range(12)]
+
+    def new_search(self):
+        # Killers belong to the previous position; history carries over at reduced weight.
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.age_history()
+
+    def age_history(self):
+        for table in self.history:
+            for square in range(64):
+                table[square] >>= 1
+
+    def is_quiet(self, board, move):
+        # Quiet moves neither capture nor promote.
+        to_sq = move >> 6 & 63
+        if move >> 12 or board.mailbox[to_sq] is not None:
+            return False
+        piece = board.mailbox[move & 63]
+        return not (piece[1] == PAWN and to_sq == board.ep_square)
+
+    def score_move(self, board, move, ply, tt_move=0):
+        if move == tt_move:
+            return TT_MOVE_SCORE
+        from_sq = move & 63
+        to_sq = move >> 6 & 63
+        promotion = move >> 12
+        color, piece_type = board.mailbox[from_sq]
+        victim = board.mailbox[to_sq]
+
+        if victim is not None or promotion or (piece_type == PAWN and to_sq == board.ep_square):
+            if victim is not None:
+                victim_value = MVV_LVA_VALUES[victim[1]]
+            elif piece_type == PAWN and to_sq == board.ep_square:
+                victim_value = MVV_LVA_VALUES[PAWN]  # En passant takes the pawn behind the target square.
+            else:
+                victim_value = 0
+            # Underpromotions are rarely better than a queen, so only the queen gets the bonus.
+            promotion_value = MVV_LVA_VALUES[QUEEN] if promotion == QUEEN else 0
+            return CAPTURE_SCORE + (victim_value + promotion_value) * 16 - MVV_LVA_VALUES[piece_type]
+
+        killers = self.killers[ply] if ply < MAX_PLY else (0, 0)
+        if move == killers[0]:
+            return KILLER_SCORES[0]
+        if move == killers[1]:
+            return KILLER_SCORES[1]
+        return self.history[color * 6 + piece_type][to_sq]
+
+    def ordered_moves(self, board, moves, ply, tt_move=0):
+        """
+        Yield moves from best to worst score.
+        """
+        scored = [(self.score_move(board, move, ply, tt_move), move) for move in moves]
+        scored.sort(reverse=True)
+        for _, move in scored:
+            yield move
+
+    def record_cutoff(self, board, move, ply, depth):
+        """
+        Remember a quiet move that caused a beta cutoff. Call with the move taken back.
+        """
+        if not self.is_quiet(board, move):
+            return
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        color, piece_type = board.mailbox[move & 63]
+        table = self.history[color * 6 + piece_type]
+        to_sq = move >> 6 & 63
+        table[to_sq] += depth * depth
+        if table[to_sq] > HISTORY_LIMIT:
+            self.age_history()
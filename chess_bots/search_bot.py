@@ -0,0 +1,237 @@
+"""
+Alpha-beta search bot.
+Negamax with alpha-beta pruning and iterative deepening under a wall-clock budget,
+followed by a quiescence search over captures and promotions at the leaves.
+The search runs on a copy of the game's board using push/pop, never on the live board.
+"""
+import time
+
+from chess import PIECE_SYMBOLS, decode_move, square_coords
+from chess_bots.evaluation import IncrementalEvaluator
+from chess_bots.transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from chess_bots.move_ordering import MoveOrderer
+from chess_bots.see import static_exchange_eval
+
+TIME_LIMIT = 1.0  # Seconds per move.
+MAX_DEPTH = 32
+TT_SIZE_MB = 16
+MATE_SCORE = 100000
+INFINITY = 1000000
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def score_to_tt(score, ply):
+    # Mate scores are stored relative to the node so they stay valid when reached through another path.
+    if score >= MATE_SCORE - MAX_DEPTH * 2:
+        return score + ply
+    if score <= -MATE_SCORE + MAX_DEPTH * 2:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    if score >= MATE_SCORE - MAX_DEPTH * 2:
+        return score - ply
+    if score <= -MATE_SCORE + MAX_DEPTH * 2:
+        return score + ply
+    return score
+
+
+class Searcher:
+    """
+    evaluator: any object with the chess_bots.evaluation interface,
+    IncrementalEvaluator by default.
+    """
+    def __init__(self, time_limit=TIME_LIMIT, max_depth=MAX_DEPTH, tt_size_mb=TT_SIZE_MB, evaluator=None):
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.evaluator = evaluator if evaluator is not None else IncrementalEvaluator()
+        self.tt = TranspositionTable(tt_size_mb)
+        self.ordering = MoveOrderer()
+        self.nodes = 0
+        self.deadline = 0.0
+        self.best_move = None
+        self.stats = {}
+
+    def search(self, game):
+        """
+        Search the position of game and return the best encoded move found, or None if there are no moves.
+        """
+        board = game.board.copy()
+        self.evaluator.reset(board)
+        start_time = time.perf_counter()
+        self.deadline = start_time + self.time_limit
+        self.nodes = 0
+        self.tt.new_search()
+        self.ordering.new_search()
+
+        root_moves = list(self.ordering.ordered_moves(board, game.legal_moves(board), 0))
+        if not root_moves:
+            return None
+        best_move = root_moves[0]
+        best_score = 0
+        completed_depth = 0
+
+        for depth in range(1, self.max_depth + 1):
+            try:
+                score, move = self.search_root(board, root_moves, depth)
+            except SearchTimeout:
+                # The board copy may be left mid-search; only results of finished depths are used.
+                break
+            best_score, best_move = score, move
+            completed_depth = depth
+            # Search the previous best move first at the next depth.
+            root_moves.remove(move)
+            root_moves.insert(0, move)
+            if abs(score) >= MATE_SCORE - self.max_depth:
+                break
+
+        elapsed = time.perf_counter() - start_time
+        self.stats = {
+            'depth': completed_depth,
+            'score': best_score,
+            'nodes': self.nodes,
+            'time': elapsed,
+            'nps': self.nodes / elapsed if elapsed > 0 else 0,
+            'tt': self.tt.stats(),
+        }
+        return best_move
+
+    def search_root(self, board, root_moves, depth):
+        alpha = -INFINITY
+        best_move = root_moves[0]
+        for move in root_moves:
+            self.evaluator.push(board, move)
+            score = -self.negamax(board, depth - 1, -INFINITY, -alpha, 1)
+            self.evaluator.pop(board)
+            if score > alpha:
+                alpha = score
+                best_move = move
+        self.tt.store(board.zobrist, depth, EXACT, score_to_tt(alpha, 0), best_move)
+        return alpha, best_move
+
+    def negamax(self, board, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 2047 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        # Fifty-move rule and repetitions score as draws.
+        if board.halfmove_clock >= 100 or board.repetition_count() >= 2:
+            return 0
+        if depth == 0:
+            return self.quiescence(board, alpha, beta, ply)
+
+        # A stored result that searched at least as deep can answer or narrow this node.
+        key = board.zobrist
+        tt_move = 0
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_depth, bound, tt_score, tt_move = entry
+            if tt_depth >= depth:
+                tt_score = score_from_tt(tt_score, ply)
+                if bound == EXACT:
+                    return tt_score
+                if bound == LOWER_BOUND and tt_score >= beta:
+                    return tt_score
+                if bound == UPPER_BOUND and tt_score <= alpha:
+                    return tt_score
+
+        moves = self.ordering.ordered_moves(board, board.generate_pseudo_legal_moves(), ply, tt_move)
+
+        color = board.side_to_move
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = 0
+        for move in moves:
+            self.evaluator.push(board, move)
+            if board.is_in_check(color):
+                self.evaluator.pop(board)
+                continue
+            score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            self.evaluator.pop(board)
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.ordering.record_cutoff(board, move, ply, depth)
+                        break
+
+        if best_score == -INFINITY:
+            # No legal moves: checkmate (prefer the quickest) or stalemate.
+            return -MATE_SCORE + ply if board.is_in_check(color) else 0
+
+        if best_score >= beta:
+            bound = LOWER_BOUND
+        elif best_score > original_alpha:
+            bound = EXACT
+        else:
+            bound = UPPER_BOUND
+        self.tt.store(key, depth, bound, score_to_tt(best_score, ply), best_move)
+        return best_score
+
+    def quiescence(self, board, alpha, beta, ply):
+        """
+        Search only captures and promotions until the position is quiet, so leaf
+        scores are not taken in the middle of an exchange.
+        """
+        self.nodes += 1
+        if self.nodes & 2047 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        # The side to move may stand pat instead of capturing.
+        stand_pat = self.evaluate(board)
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        color = board.side_to_move
+        for move in self.ordering.ordered_moves(board, board.generate_captures(), ply):
+            # Captures that lose material in the exchange cannot raise the score.
+            if static_exchange_eval(board, move) < 0:
+                continue
+            self.evaluator.push(board, move)
+            if board.is_in_check(color):
+                self.evaluator.pop(board)
+                continue
+            score = -self.quiescence(board, -beta, -alpha, ply + 1)
+            self.evaluator.pop(board)
+
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    def evaluate(self, board):
+        return self.evaluator.evaluate(board)
+
+
+searcher = Searcher()
+_promotion_choice = 'Q'
+
+
+def get_bot_move(game):
+    global _promotion_choice
+    if game.turn == game.ai_color:
+        move = searcher.search(game)
+        if move is None:
+            return None
+        stats = searcher.stats
+        print(f"search_bot: depth {stats['depth']}, score {stats['score']}, "
+              f"{stats['nodes']} nodes in {stats['time']:.2f}s ({stats['nps']:.0f} nodes/s), "
+              f"tt hit rate {stats['tt']['hit_rate']:.1%}")
+        from_sq, to_sq, promotion = decode_move(move)
+        _promotion_choice = PIECE_SYMBOLS[promotion] if promotion else 'Q'
+        return square_coords(from_sq), square_coords(to_sq)
+    return None
+
+def handle_promotion():
+    """Handle the bot's pawn promotion"""
+    return _promotion_choice  # The piece chosen by the last search
@@ -0,0 +1,62 @@
+"""
+Static exchange evaluation (SEE).
+Plays out the sequence of captures on one square, each side always
+recapturing with its least valuable attacker, and returns the material
+the moving side wins (negative if the capture loses material).
+"""
+from chess import PAWN, KING, WHITE
+
+# Centipawn values indexed by piece type; the king only captures last.
+SEE_VALUES = [100, 320, 330, 500, 900, 20000]
+
+
+def static_exchange_eval(board, move):
+    from_sq = move & 63
+    to_sq = move >> 6 & 63
+    promotion = move >> 12
+    color, piece_type = board.mailbox[from_sq]
+    occupied = board.occupancy[0] | board.occupancy[1]
+
+    victim = board.mailbox[to_sq]
+    if victim is not None:
+        gain = SEE_VALUES[victim[1]]
+    elif piece_type == PAWN and to_sq == board.ep_square:
+        gain = SEE_VALUES[PAWN]
+        occupied ^= 1 << (to_sq + 8 if color == WHITE else to_sq - 8)
+    else:
+        gain = 0
+    if promotion:
+        gain += SEE_VALUES[promotion] - SEE_VALUES[PAWN]
+        piece_type = promotion
+
+    gains = [gain]
+    on_square = SEE_VALUES[piece_type]  # Value of the piece that now stands on the square.
+    occupied ^= 1 << from_sq
+    side = color ^ 1
+    attackers = board.attackers_to(to_sq, occupied) & occupied
+
+    while True:
+        own_attackers = attackers & board.occupancy[side]
+        if not own_attackers:
+            break
+        # Recapture with the least valuable attacker.
+        for attacker_type in range(6):
+            candidates = own_attackers & board.pieces[side][attacker_type]
+            if candidates:
+                break
+        # The king cannot recapture onto a square the other side still attacks.
+        if attacker_type == KING and attackers & board.occupancy[side ^ 1]:
+            break
+
+        gains.append(on_square - gains[-1])
+        on_square = SEE_VALUES[attacker_type]
+        # Removing the attacker may reveal a slider behind it.
+        occupied ^= candidates & -candidates
+        attackers = board.attackers_to(to_sq, occupied) & occupied
+        side ^= 1
+
+    # Each side may stop capturing when continuing would lose material.
+    while len(gains) > 1:
+        last = gains.pop()
+        gains[-1] = -max(-gains[-1], last)
+    return gains[0]
@@ -0,0 +1,98 @@
+"""
+Fixed-size transposition table for search bots.
+Entries live in parallel flat arrays indexed by the position's Zobrist key.
+Each bucket has two slots: a depth-preferred slot that keeps the deepest
+result of the current search and an always-replace slot for everything else.
+"""
+from array import array
+
+# Bound types of a stored score.
+EXACT = 0
+LOWER_BOUND = 1  # The search failed high: score >= stored score.
+UPPER_BOUND = 2  # The search failed low: score <= stored score.
+
+# Bytes per entry: key (8), score (4), move (2), depth (1), bound (1), age (1).
+ENTRY_BYTES = 17
+
+
+class TranspositionTable:
+    def __init__(self, size_mb=16):
+        # Number of buckets is the largest power of two that fits the memory budget.
+        buckets = 1
+        while buckets * 4 * ENTRY_BYTES <= size_mb * 1024 * 1024:
+            buckets *= 2
+        self.num_buckets = buckets
+        self.mask = buckets - 1
+        self.size_mb = size_mb
+
+        size = buckets * 2
+        self.keys = array('Q', bytes(8 * size))
+        self.scores = array('i', bytes(4 * size))
+        self.moves = array('H', bytes(2 * size))
+        self.depths = array('b', bytes(size))
+        self.bounds = array('B', bytes(size))
+        self.ages = array('B', bytes(size))
+        self.age = 0
+
+        # Counters for the current search, reset by new_search().
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0  # Probes that found the bucket filled by other positions.
+        self.stores = 0
+
+    def new_search(self):
+        # Entries from older searches may be overwritten by shallower results.
+        self.age = (self.age + 1) & 255
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def clear(self):
+        size = self.num_buckets * 2
+        self.keys = array('Q', bytes(8 * size))
+        self.scores = array('i', bytes(4 * size))
+        self.moves = array('H', bytes(2 * size))
+        self.depths = array('b', bytes(size))
+        self.bounds = array('B', bytes(size))
+        self.ages = array('B', bytes(size))
+        self.age = 0
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def probe(self, key):
+        """
+        Look up a position. Returns (depth, bound, score, move) or None.
+        """
+        index = (key & self.mask) << 1
+        keys = self.keys
+        if keys[index] != key:
+            index += 1
+            if keys[index] != key:
+                self.misses += 1
+                if keys[index - 1] or keys[index]:
+                    self.collisions += 1
+                return None
+        self.hits += 1
+        return self.depths[index], self.bounds[index], self.scores[index], self.moves[index]
+
+    def store(self, key, depth, bound, score, move):
+        index = (key & self.mask) << 1
+        # The depth-preferred slot takes the entry if it is the same position, at least as deep,
+        # or left over from an earlier search; otherwise the always-replace slot does.
+        if self.keys[index] != key and depth < self.depths[index] and self.ages[index] == self.age:
+            index += 1
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.bounds[index] = bound
+        self.scores[index] = score
+        self.moves[index] = move
+        self.ages[index] = self.age
+        self.stores += 1
+
+    def stats(self):
+        # Counts since the last new_search().
+        probes = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'hit_rate': self.hits / probes if probes else 0.0,
+        }
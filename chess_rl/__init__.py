@@ -0,0 +1 @@
+__all__ = ['batch_eval', 'encoder', 'actions', 'env', 'vector_env', 'self_play', 'network', 'replay_buffer', 'game_record']  # Optional: defines what 'from chess_rl import *' includes
@@ -0,0 +1,111 @@
+"""
+Fixed action space for policy networks: 64 x 64 from/to pairs plus underpromotions.
+    action = from_sq * 64 + to_sq                      normal moves and queen promotions
+    action = 4096 + (pawn * 3 + direction) * 3 + piece underpromotions, where pawn is the
+             promoting pawn's index among the 16 seventh-rank squares (a7..h7 for white, a2..h2
+             for black), direction is capture left / straight / capture right and piece is N, B, R
+Moves use the encoded form of chess.Position (from | to << 6 | promotion << 12), so the
+lookup tables are plain arrays indexed by move code or action.
+"""
+import numpy as np
+
+from chess import Game, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, move_code
+
+NUM_SQUARE_PAIRS = 64 * 64
+UNDERPROMOTION_TYPES = (KNIGHT, BISHOP, ROOK)
+NUM_UNDERPROMOTIONS = 16 * 3 * len(UNDERPROMOTION_TYPES)
+ACTION_SIZE = NUM_SQUARE_PAIRS + NUM_UNDERPROMOTIONS
+NUM_MOVE_CODES = 1 << 15
+
+
+def _underpromotion_moves():
+    # Move codes of every underpromotion, in action order.
+    moves = []
+    for from_row, to_row in ((1, 0), (6, 7)):
+        for from_col in range(8):
+            for col_step in (-1, 0, 1):
+                to_col = from_col + col_step
+                for piece_type in UNDERPROMOTION_TYPES:
+                    # Captures off the board edge keep their slot so the layout stays regular.
+                    if 0 <= to_col < 8:
+                        moves.append(move_code(from_row * 8 + from_col, to_row * 8 + to_col, piece_type))
+                    else:
+                        moves.append(-1)
+    return moves
+
+
+def _action_tables():
+    action_to_move = np.full(ACTION_SIZE, -1, dtype=np.int32)
+    move_to_action = np.full(NUM_MOVE_CODES, -1, dtype=np.int32)
+    for from_sq in range(64):
+        for to_sq in range(64):
+            action = from_sq * 64 + to_sq
+            action_to_move[action] = move_code(from_sq, to_sq)
+            move_to_action[move_code(from_sq, to_sq)] = action
+            move_to_action[move_code(from_sq, to_sq, QUEEN)] = action
+    for offset, move in enumerate(_underpromotion_moves()):
+        if move >= 0:
+            action_to_move[NUM_SQUARE_PAIRS + offset] = move
+            move_to_action[move] = NUM_SQUARE_PAIRS + offset
+    return action_to_move, move_to_action
+
+
+# ACTION_TO_MOVE[action] is the move code without a queen promotion; MOVE_TO_ACTION[move] is -1 for unused codes.
+ACTION_TO_MOVE, MOVE_TO_ACTION = _action_tables()
+
+
+def move_to_action(move):
+    return int(MOVE_TO_ACTION[move])
+
+
+def action_to_move(board, action):
+    """
+    Encoded move for action in the position board (a Position or Game).
+    A pawn reaching the last rank through a from/to action promotes to a queen.
+    """
+    if isinstance(board, Game):
+        board = board.board
+    move = int(ACTION_TO_MOVE[action])
+    if action < NUM_SQUARE_PAIRS:
+        to_row = move >> 9 & 7
+        piece = board.mailbox[move & 63]
+        if piece is not None and piece[1] == PAWN and to_row in (0, 7):
+            move |= QUEEN << 12
+    return move
+
+
+def legal_moves_array(game, board=None):
+    """
+    Legal moves of game's side to move as an int32 array of move codes.
+    """
+    moves = game.legal_move_list(game.board if board is None else board)
+    return np.fromiter(moves, dtype=np.int32, count=len(moves))
+
+
+def legal_action_mask(game, out=None):
+    """
+    Boolean mask of shape (ACTION_SIZE,) with True for the legal actions of game.
+    """
+    if out is None:
+        out = np.zeros(ACTION_SIZE, dtype=bool)
+    else:
+        out.fill(False)
+    out[MOVE_TO_ACTION[legal_moves_array(game)]] = True
+    return out
+
+
+def legal_action_masks(games, out=None):
+    """
+    (N, ACTION_SIZE) boolean masks for N games, filled with one fancy-index assignment.
+    out may be a preallocated array or a slice of one.
+    """
+    if out is None:
+        out = np.zeros((len(games), ACTION_SIZE), dtype=bool)
+    else:
+        out = out[:len(games)]
+        out.fill(False)
+    move_arrays = [legal_moves_array(game) for game in games]
+    rows = np.repeat(np.arange(len(games)), [len(moves) for moves in move_arrays])
+    if len(rows):
+        out[rows, MOVE_TO_ACTION[np.concatenate(move_arrays)]] = True
+    return out
@@ -0,0 +1,182 @@
+"""
+Batch evaluation of many positions at once with NumPy.
+Positions are stacked into an (N, 12, 8, 8) array of piece planes, plane = color * 6 + piece_type,
+and scored with one matrix product for material/PST plus bitboard shifts for mobility,
+so there is no Python loop over positions after the planes are built.
+"""
+import numpy as np
+
+from chess import Game, WHITE, BLACK, KNIGHT, BISHOP, ROOK, QUEEN
+from chess_bots.evaluation import MG_VALUES, EG_VALUES, MG_PST, EG_PST, PHASE_WEIGHTS, MAX_PHASE
+
+NUM_PLANES = 12
+FEATURE_NAMES = ('material', 'pst', 'mobility_knight', 'mobility_bishop', 'mobility_rook', 'mobility_queen')
+# Default linear weights: material and PST as centipawns, then centipawns per reachable square.
+DEFAULT_WEIGHTS = np.array([1.0, 1.0, 4.0, 3.0, 2.0, 1.0], dtype=np.float32)
+
+
+def _feature_matrix():
+    # (768, 5) matrix: columns are material mg, PST mg, material eg, PST eg and phase.
+    # Rows follow the flattened planes, black squares mirrored and negated like chess_bots.evaluation.
+    weights = np.zeros((NUM_PLANES, 64, 5), dtype=np.float32)
+    for color, sign in ((WHITE, 1), (BLACK, -1)):
+        for piece_type in range(6):
+            plane = color * 6 + piece_type
+            for square in range(64):
+                table_square = square if color == WHITE else square ^ 56
+                weights[plane, square] = (
+                    sign * MG_VALUES[piece_type],
+                    sign * MG_PST[piece_type][table_square],
+                    sign * EG_VALUES[piece_type],
+                    sign * EG_PST[piece_type][table_square],
+                    PHASE_WEIGHTS[piece_type],
+                )
+    return weights.reshape(NUM_PLANES * 64, 5)
+
+
+FEATURE_MATRIX = _feature_matrix()
+
+# Bitboard masks; square = row * 8 + col with row 0 = rank 8.
+FULL = np.uint64(0xFFFFFFFFFFFFFFFF)
+NOT_A_FILE = np.uint64(sum(1 << square for square in range(64) if square % 8 != 0))
+NOT_H_FILE = np.uint64(sum(1 << square for square in range(64) if square % 8 != 7))
+NOT_AB_FILE = np.uint64(sum(1 << square for square in range(64) if square % 8 > 1))
+NOT_GH_FILE = np.uint64(sum(1 << square for square in range(64) if square % 8 < 6))
+
+# (square offset, mask of squares a piece can land on without wrapping around the board).
+ROOK_DIRECTIONS = ((-8, FULL), (8, FULL), (1, NOT_A_FILE), (-1, NOT_H_FILE))
+BISHOP_DIRECTIONS = ((-7, NOT_A_FILE), (-9, NOT_H_FILE), (9, NOT_A_FILE), (7, NOT_H_FILE))
+KNIGHT_JUMPS = ((-17, NOT_H_FILE), (-15, NOT_A_FILE), (-10, NOT_GH_FILE), (-6, NOT_AB_FILE),
+                (6, NOT_GH_FILE), (10, NOT_AB_FILE), (15, NOT_H_FILE), (17, NOT_A_FILE))
+
+
+def _shift(bitboards, offset):
+    # Move every bit by offset squares; bits shifted off the board are dropped.
+    if offset > 0:
+        return bitboards << np.uint64(offset)
+    return bitboards >> np.uint64(-offset)
+
+
+def _slide(sliders, empty, offset, mask):
+    # Kogge-Stone fill: squares attacked by sliders in one direction, stopping at the first blocker.
+    propagate = empty & mask
+    sliders = sliders | (propagate & _shift(sliders, offset))
+    propagate = propagate & _shift(propagate, offset)
+    sliders = sliders | (propagate & _shift(sliders, 2 * offset))
+    propagate = propagate & _shift(propagate, 2 * offset)
+    sliders = sliders | (propagate & _shift(sliders, 4 * offset))
+    return _shift(sliders, offset) & mask
+
+
+def popcount(bitboards):
+    """
+    Number of set bits of each uint64 in an array.
+    """
+    bytes_view = np.ascontiguousarray(bitboards, dtype='<u8')[..., None].view(np.uint8)
+    return np.unpackbits(bytes_view, axis=-1).sum(axis=-1, dtype=np.int32)
+
+
+def stack_bitboards(positions, out=None):
+    """
+    Collect the 12 piece bitboards of each Game or Position into an (N, 12) uint64 array.
+    """
+    boards = [position.board if isinstance(position, Game) else position for position in positions]
+    if out is None:
+        out = np.empty((len(boards), NUM_PLANES), dtype='<u8')
+    out[:] = [[bitboard for color_pieces in board.pieces for bitboard in color_pieces] for board in boards]
+    return out
+
+
+def bitboards_to_planes(bitboards, out=None):
+    """
+    Unpack an (N, 12) uint64 bitboard array into (N, 12, 8, 8) uint8 piece planes.
+    """
+    count = bitboards.shape[0]
+    bits = np.unpackbits(np.ascontiguousarray(bitboards, dtype='<u8').view(np.uint8), axis=-1, bitorder='little')
+    if out is None:
+        return bits.reshape(count, NUM_PLANES, 8, 8)
+    out[:] = bits.reshape(count, NUM_PLANES, 8, 8)
+    return out
+
+
+def planes_to_bitboards(planes):
+    """
+    Pack (N, 12, 8, 8) piece planes back into an (N, 12) uint64 array.
+    """
+    count = planes.shape[0]
+    packed = np.packbits(planes.reshape(count, NUM_PLANES, 64).astype(np.uint8), axis=-1, bitorder='little')
+    return np.ascontiguousarray(packed).view('<u8').reshape(count, NUM_PLANES)
+
+
+def stack_planes(positions, out=None):
+    """
+    Stack N Game/Position objects into an (N, 12, 8, 8) uint8 array of piece planes.
+    """
+    return bitboards_to_planes(stack_bitboards(positions), out)
+
+
+def mobility_features(bitboards):
+    """
+    Squares reachable by each color's knights, bishops, rooks and queens (not counting squares
+    holding their own pieces), white minus black, as an (N, 4) array.
+    Pieces of the same type are counted together, so two knights covering one square count it once.
+    """
+    occupancy = [np.bitwise_or.reduce(bitboards[:, color * 6:color * 6 + 6], axis=1) for color in (WHITE, BLACK)]
+    empty = ~(occupancy[WHITE] | occupancy[BLACK])
+    features = np.zeros((bitboards.shape[0], 4), dtype=np.float32)
+    for color, sign in ((WHITE, 1), (BLACK, -1)):
+        not_own = ~occupancy[color]
+        pieces = bitboards[:, color * 6:color * 6 + 6]
+        knight_attacks = np.zeros_like(empty)
+        for offset, mask in KNIGHT_JUMPS:
+            knight_attacks |= _shift(pieces[:, KNIGHT], offset) & mask
+        bishop_attacks = np.zeros_like(empty)
+        queen_attacks = np.zeros_like(empty)
+        for offset, mask in BISHOP_DIRECTIONS:
+            bishop_attacks |= _slide(pieces[:, BISHOP], empty, offset, mask)
+            queen_attacks |= _slide(pieces[:, QUEEN], empty, offset, mask)
+        rook_attacks = np.zeros_like(empty)
+        for offset, mask in ROOK_DIRECTIONS:
+            rook_attacks |= _slide(pieces[:, ROOK], empty, offset, mask)
+            queen_attacks |= _slide(pieces[:, QUEEN], empty, offset, mask)
+        for index, attacks in enumerate((knight_attacks, bishop_attacks, rook_attacks, queen_attacks)):
+            features[:, index] += sign * popcount(attacks & not_own)
+    return features
+
+
+def extract_features(planes):
+    """
+    Feature array (N, len(FEATURE_NAMES)) for (N, 12, 8, 8) piece planes, from white's point of view.
+    Material and PST are tapered between middlegame and endgame by game phase.
+    """
+    count = planes.shape[0]
+    flat = planes.reshape(count, NUM_PLANES * 64).astype(np.float32)
+    material_mg, pst_mg, material_eg, pst_eg, phase = (flat @ FEATURE_MATRIX).T
+    phase = np.minimum(phase, MAX_PHASE) / MAX_PHASE
+    features = np.empty((count, len(FEATURE_NAMES)), dtype=np.float32)
+    features[:, 0] = material_mg * phase + material_eg * (1 - phase)
+    features[:, 1] = pst_mg * phase + pst_eg * (1 - phase)
+    features[:, 2:] = mobility_features(planes_to_bitboards(planes))
+    return features
+
+
+def evaluate_planes(planes, side_to_move=None, weights=DEFAULT_WEIGHTS):
+    """
+    Linear evaluation of (N, 12, 8, 8) piece planes (or an encoded (N, C, 8, 8) array whose first
+    12 planes are pieces). side_to_move is an (N,) array of WHITE/BLACK; scores are from the side to
+    move's point of view like chess_bots.evaluation, or white's if side_to_move is None.
+    """
+    scores = extract_features(planes[:, :NUM_PLANES]) @ np.asarray(weights, dtype=np.float32)
+    if side_to_move is not None:
+        scores = np.where(np.asarray(side_to_move) == BLACK, -scores, scores)
+    return scores
+
+
+def evaluate_batch(positions, weights=DEFAULT_WEIGHTS):
+    """
+    Score N Game/Position objects in one pass and return an (N,) float32 array of centipawns
+    from each side to move's point of view.
+    """
+    boards = [position.board if isinstance(position, Game) else position for position in positions]
+    side_to_move = np.fromiter((board.side_to_move for board in boards), dtype=np.int8, count=len(boards))
+    return evaluate_planes(stack_planes(boards), side_to_move, weights)
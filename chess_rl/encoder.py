@@ -0,0 +1,106 @@
+"""
+Observation encoder for RL: writes a position into a caller-supplied (C, 8, 8) buffer, or a
+batch of positions into a slice of an (N, C, 8, 8) array, without allocating new arrays per call.
+
+Planes:
+    0-11   pieces, plane = color * 6 + piece_type (same layout as chess_rl.batch_eval)
+    12     side to move (1 when white is to move)
+    13-16  castling rights K, Q, k, q
+    17     en passant target square
+    18-19  position has occurred at least 2 / 3 times
+    20     halfmove clock / 100
+    21     fullmove number / 200
+In integer buffers planes 20-21 hold the raw counts instead, clipped to 255.
+"""
+import numpy as np
+
+from chess import Game, WHITE, CASTLING_SYMBOLS
+from chess_rl.batch_eval import NUM_PLANES, stack_bitboards
+
+NUM_CHANNELS = 22
+SIDE_PLANE = 12
+CASTLING_PLANE = 13
+EP_PLANE = 17
+REPETITION_PLANE = 18
+HALFMOVE_PLANE = 20
+FULLMOVE_PLANE = 21
+HALFMOVE_SCALE = 100.0
+FULLMOVE_SCALE = 200.0
+MAX_COUNT = 255  # Largest move count written into an integer buffer.
+
+# SQUARE_BITS[row, col] is the bitboard bit of that square.
+SQUARE_BITS = (np.uint64(1) << np.arange(64, dtype=np.uint64)).reshape(8, 8)
+
+
+class ObservationEncoder:
+    """
+    Holds scratch arrays for up to batch_size positions so repeated encoding reuses the same memory.
+    Output buffers may be float (scaled move counts, for networks) or integer, e.g. uint8 to
+    save space, where the move count planes hold raw counts clipped to MAX_COUNT.
+    """
+    def __init__(self, batch_size=1):
+        self.batch_size = batch_size
+        self.bitboards = np.zeros((batch_size, NUM_PLANES), dtype='<u8')
+        self.bits = np.zeros((batch_size, NUM_PLANES, 8, 8), dtype='<u8')
+        self.scalars = np.zeros((batch_size, NUM_CHANNELS), dtype=np.float32)
+
+    def encode(self, game, out):
+        """
+        Write one Game or Position into out, an array of shape (NUM_CHANNELS, 8, 8).
+        """
+        self.encode_batch([game], out[None])
+        return out
+
+    def encode_batch(self, games, out):
+        """
+        Write len(games) positions into out[:len(games)], an (N, NUM_CHANNELS, 8, 8) array or a slice of one.
+        """
+        count = len(games)
+        if count > self.batch_size:
+            raise ValueError(f'Batch of {count} positions is larger than the encoder batch size {self.batch_size}')
+        boards = [game.board if isinstance(game, Game) else game for game in games]
+        out = out[:count]
+
+        # Piece planes: test every bitboard against every square bit in one broadcast.
+        bitboards = stack_bitboards(boards, self.bitboards[:count])
+        bits = self.bits[:count]
+        np.bitwise_and(bitboards[:, :, None, None], SQUARE_BITS, out=bits)
+        np.not_equal(bits, 0, out=out[:, :NUM_PLANES], casting='unsafe')
+
+        # Constant planes are filled from one row of scalars per position.
+        scalars = self.scalars[:count]
+        scalars.fill(0)
+        scale_counts = np.issubdtype(out.dtype, np.floating)
+        for index, board in enumerate(boards):
+            row = scalars[index]
+            row[SIDE_PLANE] = board.side_to_move == WHITE
+            for offset, (_, right) in enumerate(CASTLING_SYMBOLS):
+                row[CASTLING_PLANE + offset] = bool(board.castling & right)
+            repetitions = board.repetition_count()
+            row[REPETITION_PLANE] = repetitions >= 2
+            row[REPETITION_PLANE + 1] = repetitions >= 3
+            if scale_counts:
+                row[HALFMOVE_PLANE] = board.halfmove_clock / HALFMOVE_SCALE
+                row[FULLMOVE_PLANE] = board.fullmove_number / FULLMOVE_SCALE
+            else:
+                row[HALFMOVE_PLANE] = min(board.halfmove_clock, MAX_COUNT)
+                row[FULLMOVE_PLANE] = min(board.fullmove_number, MAX_COUNT)
+        out[:, NUM_PLANES:] = scalars[:, NUM_PLANES:, None, None]
+
+        # The en passant plane marks a single square.
+        for index, board in enumerate(boards):
+            if board.ep_square is not None:
+                out[index, EP_PLANE, board.ep_square >> 3, board.ep_square & 7] = 1
+        return out
+
+
+_default_encoder = ObservationEncoder()
+
+
+def encode_observation(game, out=None):
+    """
+    Encode one Game or Position into out (allocated as float32 if not given) and return it.
+    """
+    if out is None:
+        out = np.zeros((NUM_CHANNELS, 8, 8), dtype=np.float32)
+    return _default_encoder.encode(game, out)
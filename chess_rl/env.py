@@ -0,0 +1,133 @@
+"""
+Gym-style environment around chess.Game.
+    env = ChessEnv(opponent='random_bot')
+    observation, info = env.reset(seed=0)
+    observation, reward, terminated, truncated, info = env.step(action)
+Actions follow chess_rl.actions, observations chess_rl.encoder, and info['action_mask'] marks the legal actions.
+Nothing is printed; output from the opponent bot is discarded.
+"""
+import contextlib
+import importlib
+import random
+import time
+
+import numpy as np
+
+from chess import Game, WHITE, BLACK, COLOR_NAMES, START_FEN, PAWN, square_index
+from chess_rl.actions import ACTION_SIZE, action_to_move, legal_action_mask
+from chess_rl.encoder import NUM_CHANNELS, ObservationEncoder
+
+MAX_PLIES = 512
+
+
+def load_opponent(opponent):
+    """
+    Accepts None (the agent plays both sides), a chess_bots module or its name, e.g. 'random_bot'.
+    """
+    if opponent is None or not isinstance(opponent, str):
+        return opponent
+    return importlib.import_module('chess_bots.' + opponent)
+
+
+def bot_move(bot, game):
+    """
+    Ask a chess_bots module for its move in game, with its console output discarded,
+    and return it as an encoded move. game.ai_color must be the side to move.
+    """
+    # print() does nothing while sys.stdout is None.
+    with contextlib.redirect_stdout(None):
+        start, end = bot.get_bot_move(game)
+        promotion = None
+        if game.board.piece_at(square_index(start))[1] == PAWN and end[0] in (0, 7):
+            promotion = bot.handle_promotion()
+    return game.encode_move(start, end, promotion)
+
+
+class ChessEnv:
+    """
+    agent_color: WHITE, BLACK or None to pick a side at random on every reset.
+    Rewards are +1 for a win, -1 for a loss and 0 otherwise, for the agent. Without an opponent
+    the agent moves for both sides and the reward is for the side that just moved.
+    The observation and action mask arrays are reused; copy them to keep them past the next step.
+    """
+    def __init__(self, opponent='random_bot', agent_color=WHITE, max_plies=MAX_PLIES, fen=START_FEN,
+                 observation_dtype=np.float32):
+        self.opponent = load_opponent(opponent)
+        self.agent_color = agent_color
+        self.max_plies = max_plies
+        self.fen = fen
+        self.encoder = ObservationEncoder()
+        self.observation = np.zeros((NUM_CHANNELS, 8, 8), dtype=observation_dtype)
+        self.action_mask = np.zeros(ACTION_SIZE, dtype=bool)
+        self.game = None
+        self.color = WHITE
+        self.plies = 0
+        self.status = 'ongoing'
+
+    def reset(self, seed=None):
+        # The bots in chess_bots use the random module, so seeding it makes their games repeatable.
+        if seed is not None:
+            random.seed(seed)
+        self.game = Game()
+        if self.fen != START_FEN:
+            self.game.load_fen(self.fen)
+        self.color = random.choice((WHITE, BLACK)) if self.agent_color is None else self.agent_color
+        self.game.ai_color = COLOR_NAMES[1 - self.color]
+        self.plies = 0
+        self.status = self.game.game_status()
+
+        opponent_time = 0.0
+        if self.opponent is not None and self.game.board.side_to_move != self.color and self.status == 'ongoing':
+            opponent_time = self._opponent_move()
+        return self._observe(), self._info(0.0, opponent_time)
+
+    def step(self, action):
+        if self.game is None:
+            raise RuntimeError('Call reset() before step()')
+        if self.status != 'ongoing' or self.plies >= self.max_plies:
+            raise RuntimeError('The episode is over; call reset()')
+        start_time = time.perf_counter()
+        if not self.action_mask[action]:
+            raise ValueError(f'Action {action} is not legal in this position')
+
+        self.game.push(action_to_move(self.game.board, action))
+        self.plies += 1
+        self.status = self.game.game_status()
+        reward = 1.0 if self.status == 'checkmate' else 0.0
+        agent_time = time.perf_counter() - start_time
+
+        opponent_time = 0.0
+        if self.opponent is not None and self.status == 'ongoing' and self.plies < self.max_plies:
+            opponent_time = self._opponent_move()
+            if self.status == 'checkmate':
+                reward = -1.0
+
+        terminated = self.status != 'ongoing'
+        truncated = not terminated and self.plies >= self.max_plies
+        return self._observe(), reward, terminated, truncated, self._info(agent_time, opponent_time)
+
+    def _opponent_move(self):
+        # Let the bot move for its side and return the time it took.
+        start_time = time.perf_counter()
+        self.game.push(bot_move(self.opponent, self.game))
+        self.plies += 1
+        self.status = self.game.game_status()
+        return time.perf_counter() - start_time
+
+    def _observe(self):
+        self.encoder.encode(self.game.board, self.observation)
+        if self.status == 'ongoing':
+            legal_action_mask(self.game, self.action_mask)
+        else:
+            self.action_mask.fill(False)
+        return self.observation
+
+    def _info(self, agent_time, opponent_time):
+        return {
+            'action_mask': self.action_mask,
+            'status': self.status,
+            'plies': self.plies,
+            'agent_color': self.color,
+            'step_time': agent_time,
+            'opponent_time': opponent_time,
+        }
@@ -0,0 +1,366 @@
+"""
+Compact binary game records.
+A file starts with MAGIC and holds one record per game:
+    header  uint16 plies, uint8 result, uint8 termination, uint16 FEN length, uint16 tags length
+    FEN     UTF-8 start position, empty for the standard start
+    tags    UTF-8 JSON object of extra metadata (e.g. the bot names), empty if none
+    moves   one uint16 per ply, the 15-bit encoded move of chess.Position
+All numbers are little-endian. GameWriter streams records to a file, read_games() reads them back one
+at a time, and records convert to and from PGN.
+"""
+import json
+import re
+import struct
+
+import numpy as np
+
+from chess import Game, START_FEN, PAWN, KING, PIECE_SYMBOLS, parse_square, square_name
+
+MAGIC = b'CGR1'
+HEADER = struct.Struct('<HBBHH')
+RESULTS = ('*', '1-0', '0-1', '1/2-1/2')
+TERMINATIONS = ('max_plies', 'checkmate', 'stalemate', 'fifty_move_rule', 'threefold_repetition',
+                'insufficient_material', 'other')
+MAX_PLIES = 0xFFFF
+
+
+class GameRecord:
+    """
+    One decoded game. moves is a uint16 array of encoded moves.
+    """
+    def __init__(self, moves, result='*', termination='other', fen=None, tags=None):
+        self.moves = np.asarray(moves, dtype=np.uint16)
+        self.result = result
+        self.termination = termination
+        self.fen = fen or START_FEN
+        self.tags = tags or {}
+
+    def __len__(self):
+        return len(self.moves)
+
+    def new_game(self):
+        game = Game()
+        if self.fen != START_FEN:
+            game.load_fen(self.fen)
+        return game
+
+    def replay(self):
+        """
+        Lazily yield (game, move) before each move is played, then (game, None) at the end.
+        The same Game object is advanced between steps.
+        """
+        game = self.new_game()
+        for move in self.moves.tolist():
+            yield game, move
+            game.push(move)
+        yield game, None
+
+    def final_game(self):
+        game = self.new_game()
+        for move in self.moves.tolist():
+            game.push(move)
+        return game
+
+    def encode(self):
+        return encode_game(self.moves, self.result, self.termination, self.fen, self.tags)
+
+
+def encode_game(moves, result='*', termination='other', fen=None, tags=None):
+    moves = np.asarray(moves, dtype='<u2')
+    if len(moves) > MAX_PLIES:
+        raise ValueError(f'A record holds at most {MAX_PLIES} plies, got {len(moves)}')
+    fen_bytes = b'' if fen is None or fen == START_FEN else fen.encode()
+    tag_bytes = json.dumps(tags, separators=(',', ':')).encode() if tags else b''
+    header = HEADER.pack(len(moves), RESULTS.index(result), TERMINATIONS.index(termination),
+                         len(fen_bytes), len(tag_bytes))
+    return header + fen_bytes + tag_bytes + moves.tobytes()
+
+
+def decode_header(data, offset=0):
+    """
+    Returns (plies, result, termination, total record size) of the record at offset in data.
+    """
+    plies, result, termination, fen_length, tags_length = HEADER.unpack_from(data, offset)
+    return plies, RESULTS[result], TERMINATIONS[termination], HEADER.size + fen_length + tags_length + 2 * plies
+
+
+def decode_game(data, offset=0):
+    """
+    Returns (GameRecord, offset of the next record) for the record at offset in data.
+    """
+    plies, result, termination, fen_length, tags_length = HEADER.unpack_from(data, offset)
+    offset += HEADER.size
+    fen = bytes(data[offset:offset + fen_length]).decode() if fen_length else None
+    offset += fen_length
+    tags = json.loads(bytes(data[offset:offset + tags_length])) if tags_length else None
+    offset += tags_length
+    moves = np.frombuffer(data, dtype='<u2', count=plies, offset=offset).astype(np.uint16)
+    return GameRecord(moves, RESULTS[result], TERMINATIONS[termination], fen, tags), offset + 2 * plies
+
+
+class GameWriter:
+    """
+    Appends records to a file, writing MAGIC first if the file is new or empty.
+        with GameWriter('games.bin') as writer:
+            writer.write(moves, '1-0', 'checkmate', tags={'White': 'search_bot'})
+    """
+    def __init__(self, path):
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        self.count = 0
+
+    def write(self, moves, result='*', termination='other', fen=None, tags=None):
+        self.write_bytes(encode_game(moves, result, termination, fen, tags))
+
+    def write_record(self, record):
+        self.write_bytes(record.encode())
+
+    def write_bytes(self, data):
+        # data must be one whole record from encode_game().
+        self.file.write(data)
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_games(path):
+    """
+    Yield a GameRecord for every game in the file, reading one record at a time.
+    """
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a game record file')
+        while True:
+            header = file.read(HEADER.size)
+            if not header:
+                return
+            if len(header) < HEADER.size:
+                raise ValueError(f'{path} ends in the middle of a record')
+            plies, _, _, fen_length, tags_length = HEADER.unpack(header)
+            body = file.read(fen_length + tags_length + 2 * plies)
+            if len(body) < fen_length + tags_length + 2 * plies:
+                raise ValueError(f'{path} ends in the middle of a record')
+            yield decode_game(header + body)[0]
+
+
+def move_to_san(game, move):
+    """
+    Standard algebraic notation of a legal encoded move in game's current position, e.g. 'Nbd7' or 'exd8=Q+'.
+    """
+    board = game.board
+    from_sq = move & 63
+    to_sq = move >> 6 & 63
+    promotion = move >> 12
+    piece_type = board.mailbox[from_sq][1]
+
+    if piece_type == KING and abs(to_sq - from_sq) == 2:
+        san = 'O-O' if to_sq > from_sq else 'O-O-O'
+    else:
+        capture = board.mailbox[to_sq] is not None or (piece_type == PAWN and to_sq == board.ep_square)
+        if piece_type == PAWN:
+            san = square_name(from_sq)[0] + 'x' if capture else ''
+        else:
+            san = PIECE_SYMBOLS[piece_type]
+            # Other pieces of the same type that can reach the same square.
+            rivals = [other & 63 for other in game.legal_move_list(board)
+                      if other >> 6 & 63 == to_sq and other & 63 != from_sq
+                      and board.mailbox[other & 63][1] == piece_type]
+            if rivals:
+                if all(rival % 8 != from_sq % 8 for rival in rivals):
+                    san += square_name(from_sq)[0]
+                elif all(rival // 8 != from_sq // 8 for rival in rivals):
+                    san += square_name(from_sq)[1]
+                else:
+                    san += square_name(from_sq)
+            if capture:
+                san += 'x'
+        san += square_name(to_sq)
+        if promotion:
+            san += '=' + PIECE_SYMBOLS[promotion]
+
+    board.push(move)
+    if board.is_in_check(board.side_to_move):
+        san += '#' if not game.legal_move_list(board) else '+'
+    board.pop()
+    return san
+
+
+SAN_PATTERN = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQnbrq]))?$')
+SAN_SUFFIX = re.compile(r'(?:e\.p\.|[+#!?])+$')
+FILE_MASKS = {'abcdefgh'[col]: sum(1 << (row * 8 + col) for row in range(8)) for col in range(8)}
+RANK_MASKS = {str(8 - row): 0xFF << (row * 8) for row in range(8)}
+
+
+def san_to_move(game, san):
+    """
+    Encoded legal move for a SAN string in game's current position.
+    Accepts the usual variations: extra disambiguation ('Ngf3'), 'e8Q' without '=', 'e.p.',
+    missing or extra '+'/'#' and annotations like '!?'.
+    """
+    board = game.board
+    color = board.side_to_move
+    token = SAN_SUFFIX.sub('', san.strip()).replace('0', 'O')
+    if token in ('O-O', 'O-O-O'):
+        # Castling is the king moving two files; kingside moves it towards higher squares.
+        from_mask = board.pieces[color][KING]
+        to_sq = from_mask.bit_length() - 1 + (2 if token == 'O-O' else -2)
+        promotion = 0
+    else:
+        match = SAN_PATTERN.match(token)
+        if not match:
+            raise ValueError(f'Cannot parse move {san!r} in position {game.get_fen()}')
+        piece, from_file, from_rank, target, promotion = match.groups()
+        from_mask = board.pieces[color][PIECE_SYMBOLS.index(piece) if piece else PAWN]
+        if from_file:
+            from_mask &= FILE_MASKS[from_file]
+        if from_rank:
+            from_mask &= RANK_MASKS[from_rank]
+        to_sq = parse_square(target)
+        promotion = PIECE_SYMBOLS.index(promotion.upper()) if promotion else 0
+
+    # Only the pseudo-legal moves that fit the SAN are tried on the board for legality.
+    matches = []
+    for move in board.generate_pseudo_legal_moves(from_mask):
+        if move >> 6 & 63 == to_sq and move >> 12 == promotion:
+            board.push(move)
+            if not board.is_in_check(color):
+                matches.append(move)
+            board.pop()
+    if len(matches) != 1:
+        raise ValueError(f'Illegal or ambiguous move {san!r} in position {game.get_fen()}')
+    return matches[0]
+
+
+def _escape_tag(value):
+    # PGN tag values escape backslashes and quotes with a backslash.
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _unescape_tag(value):
+    return re.sub(r'\\(.)', r'\1', value)
+
+
+def record_to_pgn(record):
+    tags = {'Event': '?', 'Site': '?', 'Date': '????.??.??', 'Round': '?', 'White': '?', 'Black': '?'}
+    tags.update(record.tags)
+    tags['Result'] = record.result
+    tags['Termination'] = record.termination
+    if record.fen != START_FEN:
+        tags['SetUp'] = '1'
+        tags['FEN'] = record.fen
+    lines = [f'[{key} "{_escape_tag(value)}"]' for key, value in tags.items()]
+
+    # Move numbers stay on the same line as the move they number.
+    tokens = []
+    for game, move in record.replay():
+        if move is None:
+            break
+        board = game.board
+        san = move_to_san(game, move)
+        if board.side_to_move == 0:
+            tokens.append(f'{board.fullmove_number}. {san}')
+        elif not tokens:
+            tokens.append(f'{board.fullmove_number}... {san}')
+        else:
+            tokens.append(san)
+    tokens.append(record.result)
+
+    # Wrap the movetext at 80 characters like most PGN writers.
+    text_lines = []
+    line = ''
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > 80:
+            text_lines.append(line)
+            line = token
+        else:
+            line = f'{line} {token}' if line else token
+    text_lines.append(line)
+    return '\n'.join(lines) + '\n\n' + '\n'.join(text_lines) + '\n'
+
+
+TAG_PATTERN = re.compile(r'^\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]\s*$')
+MOVETEXT_NOISE = re.compile(r'\{[^}]*\}|;[^\n]*|\$\d+|e\.p\.')
+MOVE_NUMBER = re.compile(r'^\d+\.+$')
+
+
+def read_pgn(path):
+    """
+    Yield a GameRecord for every game in a PGN file (comments, NAGs and variations are skipped).
+    """
+    with open(path, encoding='utf-8') as file:
+        tags = {}
+        movetext = []
+        for line in file:
+            stripped = line.strip()
+            match = TAG_PATTERN.match(stripped)
+            if match:
+                if movetext:
+                    yield _pgn_game(tags, ' '.join(movetext))
+                    tags, movetext = {}, []
+                tags[match.group(1)] = _unescape_tag(match.group(2))
+            elif stripped:
+                movetext.append(stripped)
+        if tags or movetext:
+            yield _pgn_game(tags, ' '.join(movetext))
+
+
+def _pgn_game(tags, movetext):
+    # Replay the movetext to get the encoded moves and how the game ended.
+    movetext = MOVETEXT_NOISE.sub(' ', movetext)
+    while '(' in movetext:
+        movetext = re.sub(r'\([^()]*\)', ' ', movetext)
+    fen = tags.pop('FEN', None)
+    tags.pop('SetUp', None)
+    result = tags.pop('Result', '*')
+    termination = tags.pop('Termination', None)
+    record = GameRecord([], result if result in RESULTS else '*', 'other', fen, None)
+    game = record.new_game()
+    moves = []
+    for token in movetext.replace('.', '. ').split():
+        if MOVE_NUMBER.match(token) or token == '.':
+            continue
+        if token in RESULTS:
+            result = token
+            break
+        move = san_to_move(game, token)
+        game.push(move)
+        moves.append(move)
+    record.moves = np.asarray(moves, dtype=np.uint16)
+    record.result = result if result in RESULTS else '*'
+    if termination not in TERMINATIONS:
+        # PGN from elsewhere has no Termination tag of ours; work it out from the final position.
+        termination = game.game_status()
+    record.termination = termination if termination in TERMINATIONS else 'other'
+    # The standard seven tags are regenerated on export; keep the ones that say something.
+    record.tags = {key: value for key, value in tags.items() if value not in ('?', '????.??.??')}
+    return record
+
+
+def records_to_pgn(input_path, output_path):
+    """
+    Convert a binary record file to PGN. Returns the number of games written.
+    """
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as file:
+        for record in read_games(input_path):
+            file.write(record_to_pgn(record) + '\n')
+            count += 1
+    return count
+
+
+def pgn_to_records(input_path, output_path):
+    """
+    Append the games of a PGN file to a binary record file. Returns the number of games written.
+    """
+    with GameWriter(output_path) as writer:
+        for record in read_pgn(input_path):
+            writer.write_record(record)
+        return writer.count
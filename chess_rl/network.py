@@ -0,0 +1,185 @@
+"""
+Policy/value network inference in pure NumPy for CPU-only self-play.
+A residual tower of 3x3 convolutions followed by a policy head (1x1 conv, dense layer, softmax over
+the legal actions of chess_rl.actions) and a value head (1x1 conv, two dense layers, tanh).
+Convolutions use im2col: every 3x3 window is copied into a preallocated column buffer and the
+layer becomes one matrix product. Activations are kept as (N, 8, 8, channels) so the columns of a
+window are contiguous, and every intermediate array is allocated once for max_batch positions.
+
+Weights are read from an .npz file with PyTorch-style shapes:
+    input.weight (F, C, 3, 3)                        input.bias (F,)
+    blocks.{i}.conv1.weight, blocks.{i}.conv2.weight (F, F, 3, 3) and their .bias
+    policy.conv.weight (P, F, 1, 1)  policy.fc.weight (ACTION_SIZE, P * 64)
+    value.conv.weight (V, F, 1, 1)   value.fc1.weight (H, V * 64)   value.fc2.weight (1, H)
+Each conv may also have batch norm parameters {name}.bn.gamma/beta/mean/var, folded into it on load.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from chess_rl.actions import ACTION_SIZE
+from chess_rl.encoder import NUM_CHANNELS
+
+BN_EPSILON = 1e-5
+
+
+def _conv_weights(weights, name):
+    # Returns the conv as a (C * kh * kw, F) matrix for im2col and its bias, with batch norm folded in.
+    weight = weights[name + '.weight'].astype(np.float32)
+    bias = weights[name + '.bias'].astype(np.float32) if name + '.bias' in weights else \
+        np.zeros(weight.shape[0], dtype=np.float32)
+    if name + '.bn.gamma' in weights:
+        scale = weights[name + '.bn.gamma'] / np.sqrt(weights[name + '.bn.var'] + BN_EPSILON)
+        weight = weight * scale[:, None, None, None]
+        bias = (bias - weights[name + '.bn.mean']) * scale + weights[name + '.bn.beta']
+    return np.ascontiguousarray(weight.transpose(1, 2, 3, 0).reshape(-1, weight.shape[0])), bias.astype(np.float32)
+
+
+def _dense_weights(weights, name, channels=None):
+    # Returns (in, out) weights. Inputs flattened from a conv are reordered from (channel, square) to (square, channel).
+    weight = weights[name + '.weight'].astype(np.float32)
+    if channels is not None:
+        weight = weight.reshape(weight.shape[0], channels, 64).transpose(0, 2, 1).reshape(weight.shape[0], -1)
+    return np.ascontiguousarray(weight.T), weights[name + '.bias'].astype(np.float32)
+
+
+class PolicyValueNetwork:
+    """
+    Call with (N, C, 8, 8) observations and (N, ACTION_SIZE) legal masks to get
+    (policy (N, ACTION_SIZE), values (N,)). This matches the batch_evaluator of chess_bots.mcts_bot.
+    The returned arrays are reused by the next call.
+    """
+    def __init__(self, weights, max_batch=64):
+        self.max_batch = max_batch
+        self.input = _conv_weights(weights, 'input')
+        num_blocks = len({key.split('.')[1] for key in weights if key.startswith('blocks.')})
+        self.blocks = [(_conv_weights(weights, f'blocks.{index}.conv1'), _conv_weights(weights, f'blocks.{index}.conv2'))
+                       for index in range(num_blocks)]
+        self.policy_conv = _conv_weights(weights, 'policy.conv')
+        self.value_conv = _conv_weights(weights, 'value.conv')
+        self.policy_fc = _dense_weights(weights, 'policy.fc', self.policy_conv[0].shape[1])
+        self.value_fc1 = _dense_weights(weights, 'value.fc1', self.value_conv[0].shape[1])
+        self.value_fc2 = _dense_weights(weights, 'value.fc2')
+
+        input_channels = self.input[0].shape[0] // 9
+        filters = self.input[0].shape[1]
+        policy_channels = self.policy_conv[0].shape[1]
+        value_channels = self.value_conv[0].shape[1]
+        # Zero-padded inputs and im2col columns for the input layer and the tower.
+        self.input_padded = np.zeros((max_batch, 10, 10, input_channels), dtype=np.float32)
+        self.input_columns = np.zeros((max_batch, 8, 8, input_channels, 3, 3), dtype=np.float32)
+        self.padded = np.zeros((max_batch, 10, 10, filters), dtype=np.float32)
+        self.columns = np.zeros((max_batch, 8, 8, filters, 3, 3), dtype=np.float32)
+        self.activations = [np.zeros((max_batch, 8, 8, filters), dtype=np.float32) for _ in range(2)]
+        self.policy_features = np.zeros((max_batch, 8, 8, policy_channels), dtype=np.float32)
+        self.value_features = np.zeros((max_batch, 8, 8, value_channels), dtype=np.float32)
+        self.value_hidden = np.zeros((max_batch, self.value_fc1[0].shape[1]), dtype=np.float32)
+        self.policy = np.zeros((max_batch, ACTION_SIZE), dtype=np.float32)
+        self.values = np.zeros(max_batch, dtype=np.float32)
+
+    @classmethod
+    def load(cls, path, max_batch=64):
+        with np.load(path) as weights:
+            return cls(dict(weights), max_batch)
+
+    def _conv3x3(self, padded, columns, layer, out, count):
+        # out = conv(padded) through im2col; the padding border stays zero.
+        windows = sliding_window_view(padded[:count], (3, 3), axis=(1, 2))
+        columns = columns[:count]
+        np.copyto(columns, windows)
+        weight, bias = layer
+        out = out[:count]
+        np.matmul(columns.reshape(count * 64, -1), weight, out=out.reshape(count * 64, -1))
+        out += bias
+
+    def _conv1x1(self, x, layer, out, count):
+        weight, bias = layer
+        out = out[:count]
+        np.matmul(x[:count].reshape(count * 64, -1), weight, out=out.reshape(count * 64, -1))
+        out += bias
+        np.maximum(out, 0, out=out)
+        return out.reshape(count, -1)
+
+    def __call__(self, observations, masks):
+        count = len(observations)
+        if count > self.max_batch:
+            # Larger batches are run in chunks through the same buffers.
+            policy = np.empty((count, ACTION_SIZE), dtype=np.float32)
+            values = np.empty(count, dtype=np.float32)
+            for start in range(0, count, self.max_batch):
+                stop = min(start + self.max_batch, count)
+                chunk_policy, chunk_values = self(observations[start:stop], masks[start:stop])
+                policy[start:stop] = chunk_policy
+                values[start:stop] = chunk_values
+            return policy, values
+
+        # Input layer: NCHW observations into the padded NHWC buffer.
+        self.input_padded[:count, 1:9, 1:9] = observations.transpose(0, 2, 3, 1)
+        x, spare = self.activations
+        self._conv3x3(self.input_padded, self.input_columns, self.input, x, count)
+        np.maximum(x[:count], 0, out=x[:count])
+
+        # Residual tower.
+        interior = self.padded[:count, 1:9, 1:9]
+        for conv1, conv2 in self.blocks:
+            interior[...] = x[:count]
+            self._conv3x3(self.padded, self.columns, conv1, spare, count)
+            np.maximum(spare[:count], 0, out=spare[:count])
+            interior[...] = spare[:count]
+            self._conv3x3(self.padded, self.columns, conv2, spare, count)
+            spare[:count] += x[:count]
+            np.maximum(spare[:count], 0, out=spare[:count])
+            x, spare = spare, x
+
+        # Policy head: softmax over the legal actions only.
+        features = self._conv1x1(x, self.policy_conv, self.policy_features, count)
+        policy = self.policy[:count]
+        np.matmul(features, self.policy_fc[0], out=policy)
+        policy += self.policy_fc[1]
+        policy -= policy.max(axis=1, keepdims=True)
+        np.exp(policy, out=policy)
+        policy *= masks
+        policy /= np.maximum(policy.sum(axis=1, keepdims=True), 1e-30)
+
+        # Value head.
+        features = self._conv1x1(x, self.value_conv, self.value_features, count)
+        hidden = self.value_hidden[:count]
+        np.matmul(features, self.value_fc1[0], out=hidden)
+        hidden += self.value_fc1[1]
+        np.maximum(hidden, 0, out=hidden)
+        values = self.values[:count]
+        np.matmul(hidden, self.value_fc2[0], out=values[:, None])
+        values += self.value_fc2[1]
+        np.tanh(values, out=values)
+        return policy, values
+
+
+def random_weights(filters=64, blocks=4, policy_channels=8, value_channels=4, value_hidden=128, seed=0):
+    """
+    Randomly initialised weights in the .npz layout, for benchmarks and as a starting point.
+    """
+    rng = np.random.default_rng(seed)
+
+    def conv(name, out_channels, in_channels, size):
+        fan_in = in_channels * size * size
+        weights[name + '.weight'] = rng.normal(0, np.sqrt(2 / fan_in), (out_channels, in_channels, size, size)).astype(np.float32)
+        weights[name + '.bias'] = np.zeros(out_channels, dtype=np.float32)
+
+    def dense(name, out_features, in_features):
+        weights[name + '.weight'] = rng.normal(0, np.sqrt(1 / in_features), (out_features, in_features)).astype(np.float32)
+        weights[name + '.bias'] = np.zeros(out_features, dtype=np.float32)
+
+    weights = {}
+    conv('input', filters, NUM_CHANNELS, 3)
+    for index in range(blocks):
+        conv(f'blocks.{index}.conv1', filters, filters, 3)
+        conv(f'blocks.{index}.conv2', filters, filters, 3)
+    conv('policy.conv', policy_channels, filters, 1)
+    dense('policy.fc', ACTION_SIZE, policy_channels * 64)
+    conv('value.conv', value_channels, filters, 1)
+    dense('value.fc1', value_hidden, value_channels * 64)
+    dense('value.fc2', 1, value_hidden)
+    return weights
+
+
+def save_weights(path, weights):
+    np.savez(path, **weights)
@@ -0,0 +1,149 @@
+"""
+Replay buffer for self-play training samples, stored on disk as memory-mapped .npy files.
+    buffer = ReplayBuffer('replay', capacity=1_000_000)
+    buffer.append(observation, policy, value)
+    observations, policies, values, indices, weights = buffer.sample(256)
+    buffer.flush()
+A fixed-capacity ring: once full, new samples overwrite the oldest ones. Opening the same directory
+again resumes from the last flush(). Only the pages that are read or written are loaded into RAM.
+"""
+import json
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from chess_rl.actions import ACTION_SIZE
+from chess_rl.encoder import NUM_CHANNELS
+
+STATE_FILE = 'state.json'
+
+
+class ReplayBuffer:
+    """
+    Holds (observation, policy target, outcome) samples plus a priority per sample for prioritized sampling.
+    """
+    def __init__(self, directory, capacity, observation_shape=(NUM_CHANNELS, 8, 8), observation_dtype=np.float32,
+                 policy_size=ACTION_SIZE, policy_dtype=np.float16):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        specs = {
+            'observations': ((capacity,) + tuple(observation_shape), observation_dtype),
+            'policies': ((capacity, policy_size), policy_dtype),
+            'values': ((capacity,), np.float32),
+            'priorities': ((capacity,), np.float32),
+        }
+        state_path = os.path.join(directory, STATE_FILE)
+        resume = os.path.exists(state_path)
+        self.arrays = {}
+        for name, (shape, dtype) in specs.items():
+            path = os.path.join(directory, name + '.npy')
+            if resume:
+                array = open_memmap(path, mode='r+')
+                if array.shape != shape or array.dtype != np.dtype(dtype):
+                    raise ValueError(f'{path} holds {array.shape} {array.dtype}, expected {shape} {np.dtype(dtype)}')
+            else:
+                array = open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+            self.arrays[name] = array
+        self.observations = self.arrays['observations']
+        self.policies = self.arrays['policies']
+        self.values = self.arrays['values']
+        self.priorities = self.arrays['priorities']
+
+        self.capacity = capacity
+        self.position = 0  # Index the next sample is written to.
+        self.size = 0
+        self.max_priority = 1.0
+        if resume:
+            with open(state_path) as file:
+                state = json.load(file)
+            self.position = state['position']
+            self.size = state['size']
+            self.max_priority = state['max_priority']
+
+    def __len__(self):
+        return self.size
+
+    def append(self, observation, policy, value, priority=None):
+        """
+        Store one sample. New samples get the highest priority seen so far unless one is given.
+        """
+        index = self.position
+        self.observations[index] = observation
+        self.policies[index] = policy
+        self.values[index] = value
+        self.priorities[index] = self.max_priority if priority is None else priority
+        self.position = (index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def extend(self, observations, policies, values, priorities=None):
+        """
+        Store a batch of samples with at most two slice writes per array.
+        """
+        count = len(values)
+        if count > self.capacity:
+            # Only the newest capacity samples would survive anyway.
+            observations, policies, values = observations[-self.capacity:], policies[-self.capacity:], values[-self.capacity:]
+            if priorities is not None:
+                priorities = priorities[-self.capacity:]
+            count = self.capacity
+        if priorities is None:
+            priorities = np.full(count, self.max_priority, dtype=np.float32)
+        written = 0
+        while written < count:
+            start = self.position
+            stop = min(start + count - written, self.capacity)
+            chunk = slice(written, written + stop - start)
+            self.observations[start:stop] = observations[chunk]
+            self.policies[start:stop] = policies[chunk]
+            self.values[start:stop] = values[chunk]
+            self.priorities[start:stop] = priorities[chunk]
+            written += stop - start
+            self.position = stop % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    def sample(self, batch_size, rng=None, prioritized=False, alpha=0.6, beta=0.4):
+        """
+        Draw batch_size samples, uniformly or in proportion to priority ** alpha.
+        Returns (observations, policies, values, indices, weights); weights are the importance
+        sampling corrections for prioritized sampling and all ones otherwise.
+        """
+        if self.size == 0:
+            raise ValueError('Cannot sample from an empty replay buffer')
+        rng = rng if rng is not None else np.random.default_rng()
+        if prioritized:
+            probabilities = self.priorities[:self.size].astype(np.float64) ** alpha
+            probabilities /= probabilities.sum()
+            indices = rng.choice(self.size, batch_size, p=probabilities)
+            weights = (self.size * probabilities[indices]) ** -beta
+            weights = (weights / weights.max()).astype(np.float32)
+        else:
+            indices = rng.integers(0, self.size, batch_size)
+            weights = np.ones(batch_size, dtype=np.float32)
+        # Sorted indices read the memory-mapped files front to back.
+        order = np.argsort(indices, kind='stable')
+        indices = indices[order]
+        weights = weights[order]
+        return self.observations[indices], self.policies[indices], self.values[indices], indices, weights
+
+    def update_priorities(self, indices, priorities):
+        self.priorities[indices] = priorities
+        self.max_priority = max(self.max_priority, float(np.max(priorities)))
+
+    def flush(self):
+        """
+        Write the arrays and the ring position to disk so the buffer can be reopened later.
+        """
+        for array in self.arrays.values():
+            array.flush()
+        state = {'capacity': self.capacity, 'position': self.position, 'size': self.size,
+                 'max_priority': self.max_priority}
+        state_path = os.path.join(self.directory, STATE_FILE)
+        with open(state_path + '.tmp', 'w') as file:
+            json.dump(state, file)
+        os.replace(state_path + '.tmp', state_path)
+
+    def close(self):
+        self.flush()
+        self.arrays = {}
+        self.observations = self.policies = self.values = self.priorities = None
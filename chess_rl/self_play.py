@@ -0,0 +1,129 @@
+"""
+Multiprocess self-play between bots from chess_bots.
+Each worker process plays its share of the games headlessly through Game and sends every finished
+game back through a pipe as a compact binary record of chess_rl.game_record, tagged with the bot names.
+Worker w seeds the random module with seed + w, so a run is repeatable for a given worker count
+(bots that stop on a clock, like search_bot, can still vary).
+
+Usage: python -m chess_rl.self_play num_games [--workers N] [--white random_bot] [--black random_bot]
+       [--seed 0] [--max-plies 512] [--output games.bin]
+"""
+import argparse
+import multiprocessing
+from multiprocessing.connection import wait
+import random
+import time
+
+from chess import Game, WHITE, COLOR_NAMES
+from chess_rl.env import MAX_PLIES, bot_move, load_opponent
+from chess_rl.game_record import RESULTS, GameWriter, decode_header, encode_game
+
+REPORT_INTERVAL = 5.0  # Seconds between games/sec reports.
+
+
+def play_game(white, black, max_plies=MAX_PLIES):
+    """
+    Play one game between two chess_bots modules.
+    Returns (moves, result, termination) with moves as a list of encoded moves.
+    """
+    game = Game()
+    bots = (white, black)
+    moves = []
+    status = game.game_status()
+    while status == 'ongoing' and len(moves) < max_plies:
+        color = game.board.side_to_move
+        game.ai_color = COLOR_NAMES[color]
+        move = bot_move(bots[color], game)
+        game.push(move)
+        moves.append(move)
+        status = game.game_status()
+
+    if status == 'ongoing':
+        return moves, '*', 'max_plies'
+    if status == 'checkmate':
+        # The side to move has been mated.
+        return moves, '0-1' if game.board.side_to_move == WHITE else '1-0', status
+    return moves, '1/2-1/2', status
+
+
+def _worker(connection, worker_id, num_games, white, black, seed, max_plies):
+    random.seed(seed + worker_id)
+    tags = {'White': white, 'Black': black, 'Round': str(worker_id)}
+    white = load_opponent(white)
+    black = load_opponent(black)
+    try:
+        for _ in range(num_games):
+            moves, result, termination = play_game(white, black, max_plies)
+            connection.send_bytes(encode_game(moves, result, termination, tags=tags))
+    finally:
+        connection.close()
+
+
+def run_self_play(num_games, num_workers=None, white='random_bot', black='random_bot', seed=0,
+                  max_plies=MAX_PLIES, output=None, start_method=None):
+    """
+    Play num_games games over num_workers processes, printing games/sec as they finish.
+    Records are appended to the game record file output if given. Returns the count of each result.
+    """
+    num_workers = min(num_workers or multiprocessing.cpu_count(), num_games)
+    context = multiprocessing.get_context(start_method)
+    workers = []
+    connections = []
+    for worker_id in range(num_workers):
+        # Spread the remainder over the first workers.
+        worker_games = num_games // num_workers + (worker_id < num_games % num_workers)
+        parent_connection, child_connection = context.Pipe(duplex=False)
+        worker = context.Process(target=_worker, daemon=True,
+                                 args=(child_connection, worker_id, worker_games, white, black, seed, max_plies))
+        worker.start()
+        child_connection.close()
+        workers.append(worker)
+        connections.append(parent_connection)
+
+    results = {result: 0 for result in RESULTS}
+    finished = 0
+    plies = 0
+    start_time = last_report = time.perf_counter()
+    writer = GameWriter(output) if output else None
+    try:
+        while connections:
+            for connection in wait(connections):
+                try:
+                    record = connection.recv_bytes()
+                except EOFError:
+                    connections.remove(connection)
+                    continue
+                if writer:
+                    writer.write_bytes(record)
+                game_plies, result, _, _ = decode_header(record)
+                results[result] += 1
+                finished += 1
+                plies += game_plies
+
+            now = time.perf_counter()
+            if now - last_report >= REPORT_INTERVAL:
+                last_report = now
+                print(f"{finished}/{num_games} games, {finished / (now - start_time):.1f} games/s")
+    finally:
+        if writer:
+            writer.close()
+        for worker in workers:
+            worker.join()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"{finished} games ({plies} plies) in {elapsed:.2f}s: {finished / elapsed:.1f} games/s, "
+          f"{plies / elapsed:.0f} plies/s, results {results}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Bot-vs-bot self-play with compact binary game records.')
+    parser.add_argument('num_games', type=int)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--white', default='random_bot')
+    parser.add_argument('--black', default='random_bot')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-plies', type=int, default=MAX_PLIES)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+    run_self_play(args.num_games, args.workers, args.white, args.black, args.seed, args.max_plies, args.output)
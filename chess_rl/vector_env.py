@@ -0,0 +1,208 @@
+"""
+Vector environment stepping N ChessEnv games at once.
+    envs = VectorChessEnv(64, backend='subprocess', num_workers=4, opponent='random_bot')
+    observations, infos = envs.reset(seed=0)
+    observations, rewards, terminated, truncated, infos = envs.step(actions)  # actions: (N,) ints
+Finished games are reset automatically: the returned observation and mask then belong to the new game,
+while rewards, terminated, truncated and infos['status'] describe the step that ended the old one.
+
+backend='sync' steps every game in this process. backend='subprocess' splits the games over worker
+processes that write observations, masks and rewards straight into shared memory, so only the
+actions and status strings go through the pipes.
+"""
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from chess_rl.actions import ACTION_SIZE
+from chess_rl.encoder import NUM_CHANNELS
+from chess_rl.env import ChessEnv
+
+
+def _array_specs(num_envs, observation_dtype):
+    # name: (shape, dtype) of every per-game output array.
+    return {
+        'observations': ((num_envs, NUM_CHANNELS, 8, 8), observation_dtype),
+        'action_masks': ((num_envs, ACTION_SIZE), np.bool_),
+        'rewards': ((num_envs,), np.float32),
+        'terminated': ((num_envs,), np.bool_),
+        'truncated': ((num_envs,), np.bool_),
+        'step_time': ((num_envs,), np.float64),
+        'opponent_time': ((num_envs,), np.float64),
+    }
+
+
+def _reset_envs(envs, arrays, start, seed):
+    statuses = []
+    for offset, env in enumerate(envs):
+        index = start + offset
+        observation, info = env.reset(None if seed is None else seed + index)
+        _store(arrays, index, observation, 0.0, False, False, info)
+        statuses.append(info['status'])
+    return statuses
+
+
+def _step_envs(envs, actions, arrays, start):
+    statuses = []
+    for offset, (env, action) in enumerate(zip(envs, actions)):
+        index = start + offset
+        observation, reward, terminated, truncated, info = env.step(int(action))
+        statuses.append(info['status'])
+        if terminated or truncated:
+            observation, reset_info = env.reset()
+            info = dict(reset_info, step_time=info['step_time'],
+                        opponent_time=info['opponent_time'] + reset_info['opponent_time'])
+        _store(arrays, index, observation, reward, terminated, truncated, info)
+    return statuses
+
+
+def _store(arrays, index, observation, reward, terminated, truncated, info):
+    arrays['observations'][index] = observation
+    arrays['action_masks'][index] = info['action_mask']
+    arrays['rewards'][index] = reward
+    arrays['terminated'][index] = terminated
+    arrays['truncated'][index] = truncated
+    arrays['step_time'][index] = info['step_time']
+    arrays['opponent_time'][index] = info['opponent_time']
+
+
+def _attach_arrays(specs, memories):
+    return {name: np.ndarray(shape, dtype=dtype, buffer=memories[name].buf) for name, (shape, dtype) in specs.items()}
+
+
+def _worker(connection, memory_names, specs, start, stop, env_kwargs):
+    # Runs in a child process: owns games start..stop-1 and answers commands from the parent.
+    memories = {name: shared_memory.SharedMemory(name=memory_name) for name, memory_name in memory_names.items()}
+    arrays = _attach_arrays(specs, memories)
+    envs = [ChessEnv(**env_kwargs) for _ in range(start, stop)]
+    try:
+        while True:
+            command, data = connection.recv()
+            if command == 'reset':
+                connection.send(_reset_envs(envs, arrays, start, data))
+            elif command == 'step':
+                connection.send(_step_envs(envs, data, arrays, start))
+            elif command == 'close':
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del arrays
+        for memory in memories.values():
+            memory.close()
+        connection.close()
+
+
+class VectorChessEnv:
+    """
+    num_envs games of ChessEnv(**env_kwargs). The returned arrays are reused by the next call.
+    """
+    def __init__(self, num_envs, backend='sync', num_workers=None, observation_dtype=np.float32,
+                 start_method=None, **env_kwargs):
+        # Set up first so close() works however far construction gets.
+        self.memories = {}
+        self.workers = []
+        self.connections = []
+        self.arrays = None
+        self.closed = False
+        if backend not in ('sync', 'subprocess'):
+            raise ValueError(f"Unknown backend {backend!r}, expected 'sync' or 'subprocess'")
+        self.num_envs = num_envs
+        self.backend = backend
+        env_kwargs['observation_dtype'] = observation_dtype
+        specs = _array_specs(num_envs, observation_dtype)
+
+        if backend == 'sync':
+            self.arrays = {name: np.zeros(shape, dtype=dtype) for name, (shape, dtype) in specs.items()}
+            self.envs = [ChessEnv(**env_kwargs) for _ in range(num_envs)]
+            return
+
+        try:
+            self._start_workers(specs, num_workers, start_method, env_kwargs)
+        except BaseException:
+            # Stop any workers already running and free the shared memory created so far.
+            self.close()
+            raise
+
+    def _start_workers(self, specs, num_workers, start_method, env_kwargs):
+        for name, (shape, dtype) in specs.items():
+            size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            self.memories[name] = shared_memory.SharedMemory(create=True, size=size)
+        self.arrays = _attach_arrays(specs, self.memories)
+        memory_names = {name: memory.name for name, memory in self.memories.items()}
+
+        # Contiguous blocks of games per worker.
+        num_workers = min(num_workers or multiprocessing.cpu_count(), self.num_envs)
+        bounds = np.linspace(0, self.num_envs, num_workers + 1).astype(int)
+        context = multiprocessing.get_context(start_method)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            parent_connection, child_connection = context.Pipe()
+            worker = context.Process(target=_worker, daemon=True,
+                                     args=(child_connection, memory_names, specs, int(start), int(stop), env_kwargs))
+            worker.start()
+            child_connection.close()
+            self.workers.append((worker, int(start), int(stop)))
+            self.connections.append(parent_connection)
+
+    def reset(self, seed=None):
+        """
+        Reset every game; game i is seeded with seed + i when seed is given.
+        """
+        if self.backend == 'sync':
+            statuses = _reset_envs(self.envs, self.arrays, 0, seed)
+        else:
+            for connection in self.connections:
+                connection.send(('reset', seed))
+            statuses = [status for connection in self.connections for status in connection.recv()]
+        return self.arrays['observations'], self._infos(statuses)
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f'Expected {self.num_envs} actions, got shape {actions.shape}')
+        if self.backend == 'sync':
+            statuses = _step_envs(self.envs, actions, self.arrays, 0)
+        else:
+            for connection, (_, start, stop) in zip(self.connections, self.workers):
+                connection.send(('step', actions[start:stop]))
+            statuses = [status for connection in self.connections for status in connection.recv()]
+        arrays = self.arrays
+        return arrays['observations'], arrays['rewards'], arrays['terminated'], arrays['truncated'], self._infos(statuses)
+
+    def _infos(self, statuses):
+        return {
+            'action_mask': self.arrays['action_masks'],
+            'status': statuses,
+            'step_time': self.arrays['step_time'],
+            'opponent_time': self.arrays['opponent_time'],
+        }
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for connection in self.connections:
+            try:
+                connection.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for worker, _, _ in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        for connection in self.connections:
+            connection.close()
+        self.arrays = None
+        for memory in self.memories.values():
+            memory.close()
+            memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,84 @@
+"""
+Perft benchmark and move generator correctness check.
+Counts the legal move tree of well-known reference positions, compares the
+node counts with the published values and reports nodes per second.
+
+Usage: python perft.py [max_depth] [--verify-hashes]
+--verify-hashes recomputes the Zobrist key after every move to catch drift (slow).
+"""
+import sys
+import time
+
+from chess import Game, Position
+
+
+# (name, FEN, node counts for depth 1, 2, 3, ...)
+PERFT_POSITIONS = [
+    (
+        'start',
+        'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+        [20, 400, 8902, 197281, 4865609],
+    ),
+    (
+        'kiwipete',
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+        [48, 2039, 97862, 4085603],
+    ),
+    (
+        'position3',
+        '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+        [14, 191, 2812, 43238, 674624],
+    ),
+    (
+        'position4',
+        'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+        [6, 264, 9467, 422333],
+    ),
+    (
+        'position5',
+        'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+        [44, 1486, 62379, 2103487],
+    ),
+    (
+        'position6',
+        'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+        [46, 2079, 89890, 3894594],
+    ),
+]
+
+
+def run_perft_suite(max_depth=3):
+    """
+    Run perft on every reference position up to max_depth.
+    Returns True if every node count matches.
+    """
+    all_passed = True
+    total_nodes = 0
+    total_time = 0.0
+    for name, fen, expected_counts in PERFT_POSITIONS:
+        game = Game()
+        game.load_fen(fen)
+        for depth, expected in enumerate(expected_counts[:max_depth], start=1):
+            start_time = time.perf_counter()
+            nodes = game.perft(depth)
+            elapsed = time.perf_counter() - start_time
+            total_nodes += nodes
+            total_time += elapsed
+
+            status = 'ok' if nodes == expected else f'FAIL (expected {expected})'
+            all_passed = all_passed and nodes == expected
+            nodes_per_second = nodes / elapsed if elapsed > 0 else 0
+            print(f"{name:<10} depth {depth}: {nodes:>9} nodes {elapsed:8.3f}s {nodes_per_second:>10.0f} nodes/s  {status}")
+
+    if total_time > 0:
+        print(f"total: {total_nodes} nodes in {total_time:.3f}s ({total_nodes / total_time:.0f} nodes/s)")
+    return all_passed
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if '--verify-hashes' in args:
+        args.remove('--verify-hashes')
+        Position.verify_hashes = True
+    depth = int(args[0]) if args else 3
+    sys.exit(0 if run_perft_suite(depth) else 1)